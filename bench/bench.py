@@ -0,0 +1,221 @@
+#################################################
+# S-GDB : analysis benchmarks                   #
+# -------------------                           #
+# Runs show loops and show recursion on made up #
+# functions of 1k to 1M instructions, outside   #
+# of GDB (see gdb.py in this folder).           #
+#                                               #
+# Usage: python bench/bench.py [options]        #
+#################################################
+
+# Imports
+from __future__ import with_statement
+import imp
+import json
+import optparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+# The gdb module of this folder stands in for GDB's
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+if bench_dir not in sys.path:
+  sys.path.insert(0, bench_dir)
+import gdb
+
+
+
+# ======= Synthetic Functions =======
+# Functions are made of straight-line code, if/else branches, calls and
+# loops nested up to a given depth, in the shape gcc -O0 gives them:
+#   header: cmp, conditional jump to the exit, body, increment, jmp header
+# Every instruction is 4 bytes long.
+
+INSTRUCTION_SIZE = 4
+# Straight-line instructions
+PLAIN = ["mov    -0x14(%rbp),%eax", "add    $0x1,%eax", "cltq",
+         "movzbl -0x20(%rbp,%rax,1),%edx", "mov    %eax,-0x18(%rbp)",
+         "lea    0x0(,%rax,4),%rdx", "imul   %edx,%eax", "sub    %edx,%eax"]
+
+# Operations of a function of about size instructions: (text, label) where
+# label is the operation a branch goes to, or (None, label) to place one
+class Generator(object):
+
+  def __init__(self, size, loop_density, nesting, recursion, seed):
+    self.random = random.Random(seed)
+    self.size = size
+    self.loop_density = loop_density
+    self.nesting = nesting
+    self.recursion = recursion
+    self.operations = []
+    self.labels = 0
+    self.loops = 0
+
+  def label(self):
+    self.labels += 1
+    return self.labels
+
+  # Emit about budget instructions at a nesting depth
+  def region(self, budget, depth):
+    emit = self.operations.append
+    while budget > 0:
+      choice = self.random.random()
+      if depth < self.nesting and budget > 8 and choice < self.loop_density:
+        body = self.random.randint(4, max(4, min(budget - 5, budget // 2)))
+        header = self.label()
+        exit = self.label()
+        self.loops += 1
+        emit((None, header))
+        emit(("cmpl   $0x63,-0x14(%rbp)", None))
+        emit(("jg     ", exit))
+        self.region(body, depth + 1)
+        emit(("addl   $0x1,-0x14(%rbp)", None))
+        emit(("jmp    ", header))
+        emit((None, exit))
+        budget -= body + 4
+      elif choice < self.loop_density + 0.05 and budget > 4:
+        skip = self.label()
+        emit(("test   %eax,%eax", None))
+        emit(("je     ", skip))
+        emit((PLAIN[self.random.randrange(len(PLAIN))], None))
+        emit((None, skip))
+        budget -= 3
+      elif choice < self.loop_density + 0.05 + self.recursion:
+        emit(("call   ", 0))
+        budget -= 1
+      else:
+        emit((PLAIN[self.random.randrange(len(PLAIN))], None))
+        budget -= 1
+
+  # (address, text) of the instructions of a function at start
+  def function(self, name, start):
+    self.operations = [(None, 0), ("push   %rbp", None),
+                       ("mov    %rsp,%rbp", None)]
+    self.region(self.size, 0)
+    self.operations += [("leave", None), ("ret", None)]
+    addresses = {}
+    address = start
+    for text, label in self.operations:
+      if text is None:
+        addresses[label] = address
+      else:
+        address += INSTRUCTION_SIZE
+    lines = []
+    address = start
+    for text, label in self.operations:
+      if text is None:
+        continue
+      if label is not None:
+        target = addresses[label]
+        text += "0x%x <%s+%d>" % (target, name, target - start)
+      lines.append((address, text))
+      address += INSTRUCTION_SIZE
+    return lines, address
+
+# Record a synthetic function as GDB's disas output and load it
+def load_function(name, size, loop_density, nesting, recursion, seed):
+  generator = Generator(size, loop_density, nesting, recursion, seed)
+  lines, end = generator.function(name, 0x400000)
+  text = ["Dump of assembler code for function %s:" % name]
+  text += ["   0x%016x <+%d>:\t%s" % (address, address - 0x400000, asm)
+           for address, asm in lines]
+  text.append("End of assembler dump.")
+  gdb.load_disassembly("\n".join(text))
+  return len(lines), generator.loops
+
+
+
+# ======= Measurements =======
+# Each case runs in its own process, so its peak memory can be read from
+# getrusage() without the other cases.
+
+# Peak memory of this process in KiB
+def peak_memory():
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+# Seconds taken by a command
+def timed_command(command, arg):
+  del gdb.output[:]
+  start = time.time()
+  gdb.run(command, arg)
+  return time.time() - start
+
+# Run one case and return its measurements
+def run_case(size, loop_density, nesting, recursion, seed):
+  os.environ["SGDB_QUIET"] = "1"
+  instructions, loops = load_function("synthetic", size, loop_density,
+                                      nesting, recursion, seed)
+  imp.load_source("sgdb", os.path.join(os.path.dirname(bench_dir),
+                                       "sgdb.py"))
+  baseline = peak_memory()
+  result = {"size": size, "loop_density": loop_density,
+            "nesting": nesting, "instructions": instructions,
+            "loops": loops}
+  result["loops_cold"] = timed_command("show loops", "synthetic")
+  result["loops_warm"] = timed_command("show loops", "synthetic")
+  result["recursion_cold"] = timed_command("show recursion", "synthetic")
+  result["recursion_warm"] = timed_command("show recursion", "synthetic")
+  result["memory"] = peak_memory() - baseline
+  return result
+
+# Cases of the benchmark: (size, loop density, nesting)
+def cases(options):
+  sizes = [int(size) for size in options.sizes.split(",")]
+  densities = [float(d) for d in options.densities.split(",")]
+  nestings = [int(n) for n in options.nesting.split(",")]
+  for size in sizes:
+    for density in densities:
+      for nesting in nestings:
+        yield size, density, nesting
+
+def main():
+  parser = optparse.OptionParser(usage="python bench/bench.py [options]")
+  parser.add_option("--sizes", default="1000,10000,100000,1000000",
+                    help="instructions per function (comma separated)")
+  parser.add_option("--densities", default="0.01",
+                    help="chance of starting a loop at each instruction")
+  parser.add_option("--nesting", default="3",
+                    help="deepest loop nesting")
+  parser.add_option("--recursion", type="float", default=0.001,
+                    help="chance of a recursive call at each instruction")
+  parser.add_option("--seed", type="int", default=6174)
+  parser.add_option("--json", help="also save the results to this file")
+  parser.add_option("--case", help=optparse.SUPPRESS_HELP)
+  options, args = parser.parse_args()
+
+  # Child process: run a single case
+  if options.case:
+    size, density, nesting = options.case.split(":")
+    result = run_case(int(size), float(density), int(nesting),
+                      options.recursion, options.seed)
+    sys.stdout.write(json.dumps(result) + "\n")
+    return
+
+  results = []
+  print "%9s %7s %4s %6s | %10s %10s %8s | %10s %8s | %9s" % (
+      "insns", "density", "nest", "loops", "loops (s)", "insns/s",
+      "warm (s)", "recur (s)", "warm (s)", "peak KiB")
+  for size, density, nesting in cases(options):
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__),
+         "--case", "%d:%r:%d" % (size, density, nesting),
+         "--recursion", repr(options.recursion),
+         "--seed", str(options.seed)])
+    result = json.loads(output.splitlines()[-1])
+    results.append(result)
+    print "%9d %7.3f %4d %6d | %10.3f %10.0f %8.4f | %10.3f %8.4f | %9d" % (
+        result["instructions"], density, nesting, result["loops"],
+        result["loops_cold"],
+        result["instructions"] / max(result["loops_cold"], 1e-9),
+        result["loops_warm"], result["recursion_cold"],
+        result["recursion_warm"], result["memory"])
+    sys.stdout.flush()
+  if options.json:
+    with open(options.json, "w") as output:
+      json.dump(results, output, indent=1)
+
+if __name__ == "__main__":
+  main()
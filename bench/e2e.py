@@ -0,0 +1,243 @@
+#################################################
+# S-GDB : end-to-end benchmarks                 #
+# -------------------                           #
+# Compiles generated C programs with gcc, runs  #
+# S-GDB commands on them in gdb -batch and      #
+# saves the time and memory of each command to  #
+# a CSV file.                                   #
+#                                               #
+# Usage: python bench/e2e.py [options]          #
+#        python bench/e2e.py --compare \        #
+#               a.csv b.csv                     #
+#################################################
+
+# Imports
+from __future__ import with_statement
+import csv
+import optparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sgdb_path = os.path.join(os.path.dirname(bench_dir), "sgdb.py")
+
+
+
+# ======= Programs =======
+# Each program has a work() function with size loop nests of the given
+# depth, and a recursion pattern: none, self (rec calls rec), mutual
+# (ping and pong call each other) or cycle (c1 -> c2 -> c3 -> c1).
+
+RECURSION = {
+  "none": """
+int rec(int n) { return n; }
+""",
+  "self": """
+int rec(int n) { return n <= 0 ? 0 : rec(n - 1) + data[n % SIZE]; }
+""",
+  "mutual": """
+int pong(int n);
+int ping(int n) { return n <= 0 ? 0 : pong(n - 1) + data[n % SIZE]; }
+int pong(int n) { return n <= 0 ? 1 : ping(n - 1) * 2; }
+int rec(int n) { return ping(n); }
+""",
+  "cycle": """
+int c2(int n); int c3(int n);
+int c1(int n) { return n <= 0 ? 0 : c2(n - 1) + 1; }
+int c2(int n) { return n <= 0 ? 1 : c3(n - 1) + data[n % SIZE]; }
+int c3(int n) { return n <= 0 ? 2 : c1(n - 1) * 3; }
+int rec(int n) { return c1(n); }
+""",
+}
+
+# C source of a program
+def program_source(size, nesting, recursion):
+  lines = ["#define SIZE 4096", "int data[SIZE];", RECURSION[recursion],
+           "int work(int n) {", "  int total = 0;"]
+  lines.append("  int %s;" % ", ".join("i%d" % d for d in xrange(nesting)))
+  for k in xrange(size):
+    for d in xrange(nesting):
+      lines.append("  " * (d + 1) +
+                   "for (i%d = 0; i%d < n; i%d++) {" % (d, d, d))
+    index = " + ".join("i%d" % d for d in xrange(nesting))
+    lines.append("  " * (nesting + 1) +
+                 "total += data[(%s + %d) %% SIZE];" % (index, k))
+    for d in reversed(xrange(nesting)):
+      lines.append("  " * (d + 1) + "}")
+  lines += ["  return total;", "}", "",
+            "int main(int argc, char **argv) {",
+            "  return work(argc) + rec(argc * 10);", "}", ""]
+  return "\n".join(lines)
+
+# Compile a program and return the path of the executable
+def compile_program(directory, name, source, optimization):
+  source_path = os.path.join(directory, name + ".c")
+  binary = os.path.join(directory, name)
+  with open(source_path, "w") as output:
+    output.write(source)
+  subprocess.check_call(["gcc", optimization, "-g", "-o", binary,
+                         source_path])
+  return binary
+
+
+
+# ======= gdb Scripts =======
+# The script loads S-GDB, stops in main, and runs every command through
+# measure(), which prints one line per command:
+#   SGDB-E2E <command> <seconds> <rss KiB> <peak rss KiB> <status>
+# The output of the commands is captured so the terminal does not count.
+
+SCRIPT = """set pagination off
+set confirm off
+source %(sgdb)s
+file %(binary)s
+break main
+run
+python
+import gdb, resource, time
+def measure(command):
+  status = "ok"
+  start = time.time()
+  try:
+    gdb.execute(command, to_string=True)
+  except Exception as error:
+    status = type(error).__name__
+  seconds = time.time() - start
+  with open("/proc/self/statm") as statm:
+    rss = int(statm.read().split()[1]) * resource.getpagesize() // 1024
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  gdb.write("SGDB-E2E\\t%%s\\t%%f\\t%%d\\t%%d\\t%%s\\n" %%
+            (command, seconds, rss, peak, status))
+%(measures)s
+end
+kill
+quit
+"""
+
+# Commands measured on each program. Commands run twice show the time
+# of a cold and of a warm (cached) analysis.
+COMMANDS = ["show loops work", "show loops work", "show recursion rec",
+            "show recursion rec", "show recursion --all",
+            "memory $sp 256 x g", "instruction mov", "show stack"]
+
+# Run the commands on a binary and return (command, seconds, rss, peak,
+# status) for each of them
+def run_gdb(gdb_path, directory, binary, commands):
+  script = os.path.join(directory, os.path.basename(binary) + ".gdb")
+  with open(script, "w") as output:
+    output.write(SCRIPT % {
+        "sgdb": sgdb_path, "binary": binary,
+        "measures": "\n".join("measure(%r)" % command
+                              for command in commands)})
+  environment = dict(os.environ, SGDB_QUIET="1", NO_COLOR="1")
+  process = subprocess.Popen([gdb_path, "-nx", "-batch", "-x", script],
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.STDOUT, env=environment)
+  output = process.communicate()[0]
+  results = []
+  for line in output.splitlines():
+    if line.startswith("SGDB-E2E\t"):
+      fields = line.split("\t")
+      results.append((fields[1], float(fields[2]), int(fields[3]),
+                      int(fields[4]), fields[5]))
+  if not results:
+    sys.stderr.write(output)
+    raise RuntimeError("gdb did not run the commands on " + binary)
+  return results
+
+
+
+# ======= Reports =======
+
+FIELDS = ["version", "program", "size", "nesting", "recursion",
+          "optimization", "command", "run", "seconds", "rss_kib",
+          "peak_rss_kib", "status"]
+
+# Version of S-GDB being measured
+def version():
+  try:
+    return subprocess.check_output(
+        ["git", "describe", "--always", "--dirty"],
+        cwd=os.path.dirname(bench_dir)).strip()
+  except (OSError, subprocess.CalledProcessError):
+    return "unknown"
+
+# Compare two reports: median time of each command, old and new
+def compare(old_path, new_path):
+  def load(path):
+    times = {}
+    with open(path) as report:
+      for row in csv.DictReader(report):
+        if row["status"] != "ok":
+          continue
+        key = (row["program"], row["optimization"], row["command"],
+               row["run"])
+        times.setdefault(key, []).append(float(row["seconds"]))
+    return dict((key, sorted(values)[len(values) // 2])
+                for key, values in times.items())
+  old, new = load(old_path), load(new_path)
+  print "%-28s %-4s %-24s %-4s %10s %10s %7s" % (
+      "program", "opt", "command", "run", "old (s)", "new (s)", "ratio")
+  for key in sorted(set(old) & set(new)):
+    print "%-28s %-4s %-24s %-4s %10.4f %10.4f %6.2fx" % (
+        key + (old[key], new[key], new[key] / max(old[key], 1e-9)))
+
+def main():
+  parser = optparse.OptionParser(usage="python bench/e2e.py [options]")
+  parser.add_option("--sizes", default="10,100,1000",
+                    help="loop nests in work() (comma separated)")
+  parser.add_option("--nesting", default="1,3", help="loop nesting depths")
+  parser.add_option("--recursion", default="none,self,mutual,cycle",
+                    help="recursion patterns")
+  parser.add_option("--optimizations", default="-O0,-O2",
+                    help="gcc optimization levels")
+  parser.add_option("--repeat", type="int", default=1,
+                    help="gdb runs per program")
+  parser.add_option("--gdb", default="gdb", help="gdb executable")
+  parser.add_option("--output", default="e2e.csv", help="CSV report")
+  parser.add_option("--keep", action="store_true",
+                    help="keep the generated programs and scripts")
+  parser.add_option("--compare", nargs=2, metavar="OLD NEW",
+                    help="compare two CSV reports")
+  options, args = parser.parse_args()
+  if options.compare:
+    compare(*options.compare)
+    return
+
+  directory = tempfile.mkdtemp(prefix="sgdb-e2e-")
+  label = version()
+  try:
+    with open(options.output, "wb") as report:
+      writer = csv.writer(report)
+      writer.writerow(FIELDS)
+      for size in [int(s) for s in options.sizes.split(",")]:
+        for nesting in [int(n) for n in options.nesting.split(",")]:
+          for recursion in options.recursion.split(","):
+            source = program_source(size, nesting, recursion)
+            for optimization in options.optimizations.split(","):
+              name = "p%d_n%d_%s%s" % (size, nesting, recursion,
+                                       optimization.replace("-", "_"))
+              binary = compile_program(directory, name, source,
+                                       optimization)
+              for repeat in xrange(options.repeat):
+                runs = {}
+                for command, seconds, rss, peak, status in run_gdb(
+                    options.gdb, directory, binary, COMMANDS):
+                  runs[command] = runs.get(command, 0) + 1
+                  writer.writerow([label, name, size, nesting, recursion,
+                                   optimization, command, runs[command],
+                                   "%.6f" % seconds, rss, peak, status])
+                  print "%-28s %-24s %d %9.4fs %8d KiB %s" % (
+                      name, command, runs[command], seconds, rss, status)
+                report.flush()
+  finally:
+    if options.keep:
+      print "Programs and scripts kept in " + directory
+    else:
+      shutil.rmtree(directory)
+
+if __name__ == "__main__":
+  main()
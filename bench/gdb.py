@@ -0,0 +1,338 @@
+#################################################
+# S-GDB : stand-in for GDB's python module      #
+# -------------------                           #
+# Lets the sgdblib modules run in a plain       #
+# python process, on recorded "disas" output    #
+# and memory images, for the benchmarks.        #
+#################################################
+
+# Imports
+import atexit
+import os
+import re
+import struct
+import tempfile
+
+
+
+# ======= Recorded Program =======
+# A program is a set of functions, each with the lines GDB printed for
+# "disas" (address, offset and instruction text), and a set of memory
+# images. Recordings are loaded with load_disassembly() and
+# load_memory(), or made up by the benchmarks. The executable GDB would
+# have loaded is an ELF file holding only the symbols of the functions,
+# written when it is first asked for.
+
+# Line of the disas command: "   0x0000000000400724 <+0>:\tpush   %rbp"
+DISAS_LINE = re.compile(r"^(?:=>)?\s+0x([0-9a-f]+) <\+(\d+)>:\t(.*)$")
+# First line of the disas command
+DISAS_FUNCTION = re.compile(r"^Dump of assembler code for function (\S+):$")
+
+class Program(object):
+
+  def __init__(self):
+    self.path = None        # ELF file of the functions, once written
+    self.written = None     # the file written by write_symbols()
+    self.functions = {}     # name -> (start, end)
+    self.instructions = {}  # address -> (length, text)
+    self.memory = []        # (address, bytearray)
+
+  # Path of an ELF file whose symbol table has the functions
+  @property
+  def filename(self):
+    if self.path is None:
+      self.path = self.written = write_symbols(self.functions)
+    return self.path
+
+  # Add a function from (address, text) pairs, the last instruction
+  # ending at end
+  def add_function(self, name, lines, end):
+    addresses = [address for address, text in lines]
+    for i, (address, text) in enumerate(lines):
+      following = addresses[i + 1] if i + 1 < len(addresses) else end
+      self.instructions[address] = (following - address, text)
+    self.functions[name] = (addresses[0], end)
+    self.remove()
+
+  # Remove the ELF file, it is written again when needed
+  def remove(self):
+    if self.written is not None:
+      os.remove(self.written)
+      self.written = None
+    self.path = None
+
+  # Name and range of the function containing address
+  def function_at(self, address):
+    for name, (start, end) in self.functions.items():
+      if start <= address < end:
+        return name, start, end
+    return None
+
+program = Program()
+atexit.register(program.remove)
+
+# Write a 64-bit ELF file with a symbol table of the functions (name ->
+# (start, end)) and no code, and return its path
+def write_symbols(functions):
+  strtab = b"\0"
+  symtab = b"\0" * 24
+  for name, (start, end) in sorted(functions.items()):
+    # STB_GLOBAL, STT_FUNC, in section 1
+    symtab += struct.pack("<IBBHQQ", len(strtab), 0x12, 0, 1, start,
+                          end - start)
+    strtab += name.encode("utf-8") + b"\0"
+  header = 64
+  sections = header + len(symtab) + len(strtab)
+  data = struct.pack("<4sBBB9xHHIQQQIHHHHHH", b"\x7fELF", 2, 1, 1,
+                     2, 62, 1, 0, 0, sections, 0, header, 0, 0, 64, 3, 0)
+  data += symtab + strtab
+  data += b"\0" * 64
+  data += struct.pack("<IIQQQQIIQQ", 0, 2, 0, 0, header, len(symtab), 2, 1,
+                      8, 24)
+  data += struct.pack("<IIQQQQIIQQ", 0, 3, 0, 0, header + len(symtab),
+                      len(strtab), 0, 0, 1, 0)
+  handle, path = tempfile.mkstemp(prefix="sgdb-bench-", suffix=".elf")
+  os.write(handle, data)
+  os.close(handle)
+  return path
+
+# Load the text printed by one or more "disas" commands
+def load_disassembly(text):
+  name = None
+  lines = []
+  for line in text.splitlines() + ["End of assembler dump."]:
+    match = DISAS_FUNCTION.match(line)
+    if match:
+      name = match.group(1)
+      lines = []
+      continue
+    match = DISAS_LINE.match(line)
+    if match and name is not None:
+      lines.append((int(match.group(1), 16), match.group(3)))
+      continue
+    if line.startswith("End of assembler dump.") and lines:
+      # The length of the last instruction is not recorded
+      program.add_function(name, lines, lines[-1][0] + 1)
+      name = None
+      lines = []
+
+# Load a memory image of the program
+def load_memory(address, data):
+  program.memory.append((address, bytearray(data)))
+
+# The disas output of a function, as GDB prints it
+def disassembly(name):
+  start, end = program.functions[name]
+  lines = ["Dump of assembler code for function %s:" % name]
+  address = start
+  while address < end:
+    length, text = program.instructions[address]
+    lines.append("   0x%016x <+%d>:\t%s" % (address, address - start, text))
+    address += length
+  lines.append("End of assembler dump.")
+  return "\n".join(lines) + "\n"
+
+
+
+# ======= Module Interface =======
+# The part of GDB's python API used by sgdb.py and sgdblib.
+
+class error(RuntimeError):
+  pass
+
+class GdbError(Exception):
+  pass
+
+class MemoryError(error):
+  pass
+
+COMMAND_SUPPORT = 0
+COMPLETE_NONE = 0
+COMPLETE_FILENAME = 1
+COMPLETE_SYMBOL = 2
+TYPE_CODE_PTR = 1
+TYPE_CODE_FUNC = 7
+TYPE_CODE_INT = 8
+
+# Commands registered by sgdb.py, by name
+commands = {}
+
+class Command(object):
+  def __init__(self, name, command_class, completer_class=None,
+               prefix=False):
+    commands[name] = self
+
+# Run a registered command like GDB would
+def run(command, arg=""):
+  commands[command].invoke(arg, False)
+
+# Text written by the commands
+output = []
+
+def write(text, stream=None):
+  output.append(text)
+
+def flush(stream=None):
+  pass
+
+parameters = {"pagination": False, "height": 0, "width": 0}
+
+def parameter(name):
+  return parameters.get(name)
+
+class Event(object):
+  def __init__(self):
+    self.handlers = []
+
+  def connect(self, handler):
+    self.handlers.append(handler)
+
+  def disconnect(self, handler):
+    self.handlers.remove(handler)
+
+class StopEvent(object):
+  pass
+
+class BreakpointEvent(StopEvent):
+  pass
+
+class SignalEvent(StopEvent):
+  pass
+
+class events(object):
+  stop = Event()
+  cont = Event()
+  exited = Event()
+  new_objfile = Event()
+  clear_objfiles = Event()
+  memory_changed = Event()
+  before_prompt = Event()
+
+def post_event(function):
+  function()
+
+class Type(object):
+  def __init__(self, code):
+    self.code = code
+
+class Value(object):
+  def __init__(self, value, code=TYPE_CODE_INT, address=None):
+    self.value = value
+    self.type = Type(code)
+    self.address = address
+
+  def __int__(self):
+    return self.value
+
+def parse_and_eval(expression):
+  expression = expression.strip()
+  if expression in program.functions:
+    start = program.functions[expression][0]
+    return Value(0, TYPE_CODE_FUNC, Value(start, TYPE_CODE_PTR))
+  try:
+    return Value(int(expression, 0))
+  except ValueError:
+    raise error('No symbol "%s" in current context.' % expression)
+
+class Block(object):
+  pass
+
+# Recorded programs have no debug information
+def block_for_pc(pc):
+  return None
+
+class Architecture(object):
+  def name(self):
+    return "i386:x86-64"
+
+  def disassemble(self, start_pc, end_pc=None, count=None):
+    if end_pc is None and count is None:
+      count = 1
+    instructions = []
+    address = start_pc
+    while address in program.instructions:
+      if end_pc is not None and address > end_pc:
+        break
+      if count is not None and len(instructions) == count:
+        break
+      length, text = program.instructions[address]
+      instructions.append({"addr": address, "length": length, "asm": text})
+      address += length
+    return instructions
+
+class Inferior(object):
+  pid = 0
+  num = 1
+
+  def architecture(self):
+    return Architecture()
+
+  def read_memory(self, address, length):
+    for start, data in program.memory:
+      if start <= address and address + length <= start + len(data):
+        return memoryview(data)[address - start:address - start + length]
+    raise MemoryError("Cannot access memory at address 0x%x" % address)
+
+  def write_memory(self, address, buffer, length=None):
+    for start, data in program.memory:
+      if start <= address and address + len(buffer) <= start + len(data):
+        data[address - start:address - start + len(buffer)] = buffer
+        return
+    raise MemoryError("Cannot access memory at address 0x%x" % address)
+
+def selected_inferior():
+  return Inferior()
+
+def inferiors():
+  return [Inferior()]
+
+# Recorded programs are not running
+def selected_frame():
+  raise error("No frame selected.")
+
+def newest_frame():
+  raise error("No frame selected.")
+
+class Objfile(object):
+  @property
+  def filename(self):
+    return program.filename
+
+class Progspace(object):
+  @property
+  def filename(self):
+    return program.filename
+
+def current_progspace():
+  return Progspace()
+
+def objfiles():
+  return [Objfile()]
+
+def solib_name(address):
+  return None
+
+def execute(command, from_tty=False, to_string=False):
+  text = None
+  if command.startswith("disas "):
+    found = program.function_at(int(parse_and_eval(command[6:])))
+    if found is None:
+      raise error("No function contains specified address.")
+    text = disassembly(found[0])
+  elif command.startswith("info symbol "):
+    address = int(parse_and_eval(command[12:]))
+    found = program.function_at(address)
+    if found is None:
+      text = "No symbol matches %s.\n" % command[12:]
+    else:
+      name, start, end = found
+      offset = " + %d" % (address - start) if address != start else ""
+      text = "%s%s in section .text\n" % (name, offset)
+  elif command == "show endian":
+    text = "The target endianness is set automatically " \
+           "(currently little endian).\n"
+  else:
+    raise error("Not recorded: " + command)
+  if to_string:
+    return text
+  write(text)
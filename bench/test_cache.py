@@ -0,0 +1,90 @@
+#################################################
+# S-GDB : analysis cache tests                  #
+# -------------------                           #
+# Checks the eviction of the analysis cache on  #
+# made up functions, outside of GDB (see gdb.py #
+# in this folder).                              #
+#                                               #
+# Usage: python bench/test_cache.py             #
+#################################################
+
+# Imports
+import os
+import sys
+import unittest
+
+# The gdb module of this folder stands in for GDB's
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(bench_dir))
+if bench_dir not in sys.path:
+  sys.path.insert(0, bench_dir)
+import gdb
+from bench import Generator
+from sgdblib.analysis import AnalysisCache, approximate_size
+
+# Instructions of each function, and the functions kept by the cache
+SIZE = 200
+KEPT = 3
+
+# Record the same made up function under each name, one after the other
+def load_functions(names):
+  start = 0x400000
+  for name in names:
+    lines, end = Generator(SIZE, 0.01, 2, 0, 6174).function(name, start)
+    text = ["Dump of assembler code for function %s:" % name]
+    text += ["   0x%016x <+%d>:\t%s" % (address, address - start, asm)
+             for address, asm in lines]
+    text.append("End of assembler dump.")
+    gdb.load_disassembly("\n".join(text))
+    start = end + 0x100
+
+# An analysis of the whole program of at least size bytes
+def program_analysis(size):
+  return lambda: range(size // 8)
+
+class EvictionTest(unittest.TestCase):
+
+  def setUp(self):
+    load_functions(["f%d" % i for i in range(KEPT + 1)])
+    # Room for KEPT functions
+    probe = AnalysisCache()
+    probe.function("f0")
+    size = probe.size
+    self.cache = AnalysisCache(limit=size * KEPT + size // 2,
+                               program_limit=size * 4 * KEPT)
+
+  def names(self):
+    return [function.name for function in self.cache.entries.values()]
+
+  def test_functions_evicted_in_lru_order(self):
+    for i in range(KEPT + 1):
+      self.cache.function("f%d" % i)
+    self.assertEqual(self.names(), ["f1", "f2", "f3"])
+    self.assertEqual(self.cache.evictions, 1)
+
+  # A program analysis larger than all the functions together does not
+  # flush them
+  def test_program_entry_keeps_functions(self):
+    for i in range(KEPT):
+      self.cache.function("f%d" % i)
+    self.cache.program("loops", program_analysis(self.cache.limit * 2))
+    self.cache.function("f%d" % KEPT)
+    self.assertEqual(self.names(), ["f1", "f2", "f3"])
+    self.assertTrue(self.cache.size <= self.cache.limit)
+    self.assertEqual(len(self.cache.programs), 1)
+
+  # Room for two program analyses
+  def test_program_entries_evicted_in_lru_order(self):
+    analyze = program_analysis(4096)
+    size = approximate_size(analyze())
+    cache = AnalysisCache(program_limit=size * 5 // 2)
+    cache.program("loops", analyze)
+    cache.program("call graph", analyze)
+    cache.program("loops", analyze)
+    cache.program("functions", analyze)
+    self.assertEqual([name for key, name in cache.programs],
+                     ["loops", "functions"])
+    self.assertEqual(cache.program_size, size * 2)
+
+if __name__ == "__main__":
+  unittest.main()
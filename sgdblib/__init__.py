@@ -0,0 +1,6 @@
+#################################################
+# S-GDB : command implementations               #
+# -------------------                           #
+# Modules imported by sgdb.py the first time    #
+# one of their commands is used.                #
+#################################################
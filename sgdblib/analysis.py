@@ -0,0 +1,1050 @@
+#################################################
+# S-GDB : disassembly and analysis engines      #
+#################################################
+
+# Imports
+from collections import OrderedDict
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import bisect
+import heapq
+import math
+import mmap
+import multiprocessing
+import re
+import struct
+import sys
+import time
+from sgdblib.common import colors
+from sgdblib.flow import CALLS, JUMPS, Disassembly, LoopForest
+from sgdblib.flow import loop_summaries
+from sgdblib.flow import make_instruction
+from sgdblib.output import Output, write
+
+
+
+# ======= Disassembly =======
+# Shared decoding layer used by the analysis commands (show loops,
+# show recursion). Instead of scraping the text printed by "disas",
+# the function is decoded once with gdb.Architecture.disassemble()
+# into a list of Instruction records (see sgdblib.flow).
+
+# Architecture used to decode instructions, even if the program
+# is not running yet
+def current_architecture():
+  try:
+    return gdb.selected_frame().architecture()
+  except gdb.error:
+    pass
+  try:
+    return gdb.selected_inferior().architecture()
+  except (gdb.error, AttributeError):
+    raise gdb.GdbError("Unable to find the architecture of the program. "
+                       "Did you load it with the file command?")
+
+# Decode all instructions in [start, end)
+def decode(start, end):
+  arch = current_architecture()
+  return [make_instruction(i) for i in arch.disassemble(start, end - 1)]
+
+# Find the function named by arg (or the current function if arg is
+# empty) and return its name and [start, end) address range. Without
+# debug info, the function is looked up in the ELF symbol table of the
+# program, and only then found by scraping GDB's "disas", which decodes
+# the whole function (disas=False raises a gdb.GdbError instead).
+def function_range(arg, disas=True):
+  if arg:
+    value = gdb.parse_and_eval(arg)
+    if value.type.code == gdb.TYPE_CODE_FUNC:
+      addr = int(value.address)
+    else:
+      addr = int(value)
+  else:
+    addr = int(gdb.selected_frame().pc())
+
+  # Functions with debug info have a block covering the whole function
+  block = gdb.block_for_pc(addr)
+  while block is not None and block.function is None:
+    block = block.superblock
+  if block is not None:
+    return block.function.name, block.start, block.end
+
+  found = function_table().find(addr)
+  if found is not None:
+    start, end, name = found
+    return name, start, end
+  if not disas:
+    raise gdb.GdbError("No symbol of the program contains address " +
+                       hex(addr))
+
+  # Not in the program's symbol table: let GDB find the function
+  # boundaries
+  text = gdb.execute("disas " + str(addr), to_string=True)
+  addresses = re.findall(r"^(?:=>)?\s+(0x[0-9a-f]+)", text, re.M)
+  if len(addresses) == 0:
+    raise gdb.GdbError("No function contains address " + hex(addr))
+  start = int(addresses[0], 16)
+  last = int(addresses[-1], 16)
+  end = last + current_architecture().disassemble(last)[0]["length"]
+  name = gdb.execute("info symbol " + str(start), to_string=True).split()[0]
+  return name, start, end
+
+# Decode the function named by arg
+def disassemble_function(arg):
+  name, start, end = function_range(arg)
+  return Disassembly(name, start, end, decode(start, end))
+
+# Render an instruction like the "disas" command does
+def format_instruction(insn, function, pc=None):
+  marker = "=> " if insn.addr == pc else "   "
+  return "%s0x%016x <+%d>:\t%s" % (marker, insn.addr,
+                                   insn.addr - function.start, insn.asm)
+
+# Current pc, or None if the program is not running
+def current_pc():
+  try:
+    return int(gdb.selected_frame().pc())
+  except gdb.error:
+    return None
+
+
+
+# ======= Loop Rendering =======
+# Color of a loop
+def loop_color(number):
+  return colors.color_list[(number - 1) % len(colors.color_list)]
+
+# Color the disassembly of a function with its loops.
+# intervals is a list of (first address, last address, loop number,
+# depth) and annotations maps an address to the comments of its line.
+# All loop intervals are sorted first, and then the lines are colored
+# in a single sweep over the instructions: each line gets the color of
+# the innermost loop containing it and a gutter showing its nesting
+# depth. O(n + k log k) for n instructions and k intervals.
+def render_loops(function, intervals, annotations, pc=None):
+  instructions = function.instructions
+  index = dict((insn.addr, i) for i, insn in enumerate(instructions))
+
+  # (first index, last index, number), outer loops first
+  spans = []
+  for start, end, number, depth in intervals:
+    if start in index and end in index:
+      spans.append((index[start], -index[end], depth, number))
+  spans.sort()
+  spans = [(first, -last, number) for first, last, depth, number in spans]
+
+  # Width of the nesting gutter
+  max_depth = 0
+  active = []
+  for first, last, number in spans:
+    while active and active[0] < first:
+      heapq.heappop(active)
+    heapq.heappush(active, last)
+    max_depth = max(max_depth, len(active))
+
+  lines = []
+  active = []  # heap with the last index of the loops containing i
+  stack = []   # loops containing i, innermost last
+  next_span = 0
+  for i, insn in enumerate(instructions):
+    # Loops starting here
+    while next_span < len(spans) and spans[next_span][0] == i:
+      first, last, number = spans[next_span]
+      heapq.heappush(active, last)
+      stack.append((last, number))
+      next_span += 1
+    # Loops that ended before this instruction
+    while active and active[0] < i:
+      heapq.heappop(active)
+    while stack and stack[-1][0] < i:
+      stack.pop()
+
+    line = format_instruction(insn, function, pc)
+    notes = annotations.get(insn.addr)
+    if notes:
+      line += "\t# " + "; ".join(notes)
+    if not stack:
+      lines.append(" " * (max_depth + 1) + line)
+      continue
+    gutter = ("|" * len(active)).ljust(max_depth)
+    color = loop_color(stack[-1][1])
+    if notes:
+      lines.append(colors.u + colors.bold + color + gutter + " " + line +
+                   colors.nc)
+    else:
+      lines.append(color + gutter + " " + line + colors.nc)
+  return lines
+
+# Intervals and annotations of the loops of a function, for render_loops
+def loop_overlay(forest):
+  instructions = forest.function.instructions
+  intervals = []
+  annotations = {}
+  for loop in forest.loops:
+    for start, end in forest.intervals(loop):
+      intervals.append((start, end, loop.number, loop.depth))
+    annotations.setdefault(loop.header.start, []).append(
+        "loop " + str(loop.number) + " starts here!")
+    for latch in loop.latches:
+      insn = instructions[latch.last]
+      # A latch that falls through into the header (the increment of a
+      # gcc -O0 for loop) does not jump
+      if insn.mnemonic in JUMPS and insn.target == loop.header.start:
+        note = " jumps back here!"
+      else:
+        note = " body ends here, continues to its start"
+      annotations.setdefault(insn.addr, []).append(
+          "loop " + str(loop.number) + note)
+    # The test of such a loop is in its header, and jumps back up into
+    # the body
+    insn = instructions[loop.header.last]
+    if insn.mnemonic in JUMPS and insn.target is not None and \
+        insn.target < insn.addr and insn.target != loop.header.start and \
+        any(forest.blocks[number].start == insn.target
+            for number in loop.body):
+      annotations.setdefault(insn.addr, []).append(
+          "loop " + str(loop.number) + " jumps back here!")
+  return intervals, annotations
+
+
+# ======= Heat Overlay =======
+# Run-time measurements (instructions traced, samples) shown over the
+# disassembly: each line gets a column with its value and the color of
+# its count, from colors.heat[0] for the coldest lines to colors.heat[-1]
+# for the hottest, on a logarithmic scale. Lines that never ran are not
+# colored.
+
+# Color of a count, for a function whose hottest line has hottest
+def heat_color(count, hottest):
+  if hottest <= 1:
+    return colors.heat[-1]
+  level = math.log(count) / math.log(hottest)
+  return colors.heat[min(len(colors.heat) - 1,
+                         int(level * len(colors.heat)))]
+
+# Lines of a function with the loops annotated and counts (address ->
+# number) shown by column(count) and colored
+def render_heat(function, counts, column, pc=None):
+  forest = analysis_cache.analysis(function, "loops", LoopForest)
+  intervals, annotations = loop_overlay(forest)
+  hottest = max([counts.get(insn.addr, 0)
+                 for insn in function.instructions] or [0])
+  lines = []
+  for insn in function.instructions:
+    count = counts.get(insn.addr, 0)
+    line = column(count) + " " + format_instruction(insn, function, pc)
+    notes = annotations.get(insn.addr)
+    if notes:
+      line += "\t# " + "; ".join(notes)
+    if count:
+      line = heat_color(count, hottest) + line + colors.nc
+    lines.append(line)
+  return lines
+
+
+
+# ======= Recursion =======
+# Addresses of the calls a function makes to itself, including tail
+# calls that jump back to its entry
+def recursive_calls(function):
+  return frozenset(insn.addr for insn in function.instructions
+                   if (insn.mnemonic in CALLS or insn.mnemonic == "jmp") and
+                   insn.target == function.start)
+
+
+
+# ======= Program Functions =======
+# Whole program analyses need the list of every function in the
+# executable. It is read straight from the ELF symbol table, which is
+# much faster than asking GDB about each symbol.
+
+ET_DYN = 3
+SHT_SYMTAB = 2
+SHT_DYNSYM = 11
+STT_FUNC = 2
+STT_GNU_IFUNC = 10
+
+# Functions defined in an ELF file. Returns (pie, functions) where
+# functions is a sorted list of (start, end, name) and pie tells if the
+# addresses are relative to where the program gets loaded.
+def elf_functions(path):
+  with open(path, "rb") as f:
+    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+  try:
+    if data[:4] != b"\x7fELF":
+      raise gdb.GdbError(path + " is not an ELF file.")
+    is64 = data[4:5] == b"\x02"
+    endian = "<" if data[5:6] == b"\x01" else ">"
+    if is64:
+      e_type, = struct.unpack_from(endian + "H", data, 0x10)
+      e_shoff, = struct.unpack_from(endian + "Q", data, 0x28)
+      e_shentsize, e_shnum = struct.unpack_from(endian + "HH", data, 0x3a)
+      section = struct.Struct(endian + "IIQQQQIIQQ")
+      symbol = struct.Struct(endian + "IBBHQQ")
+    else:
+      e_type, = struct.unpack_from(endian + "H", data, 0x10)
+      e_shoff, = struct.unpack_from(endian + "I", data, 0x20)
+      e_shentsize, e_shnum = struct.unpack_from(endian + "HH", data, 0x2e)
+      section = struct.Struct(endian + "IIIIIIIIII")
+      symbol = struct.Struct(endian + "IIIBBH")
+
+    # (type, offset, size, link) of every section
+    sections = []
+    for i in xrange(e_shnum):
+      fields = section.unpack_from(data, e_shoff + i * e_shentsize)
+      sections.append((fields[1], fields[4], fields[5], fields[6]))
+
+    # Prefer the full symbol table, use the dynamic one if stripped
+    tables = [s for s in sections if s[0] == SHT_SYMTAB]
+    if len(tables) == 0:
+      tables = [s for s in sections if s[0] == SHT_DYNSYM]
+
+    functions = {}
+    for kind, offset, size, link in tables:
+      strtab = sections[link][1]
+      for pos in xrange(offset, offset + size, symbol.size):
+        fields = symbol.unpack_from(data, pos)
+        if is64:
+          name, info, other, shndx, value, length = fields
+        else:
+          name, value, length, info, other, shndx = fields
+        if info & 0xf not in (STT_FUNC, STT_GNU_IFUNC) or shndx == 0 or \
+            length == 0 or value in functions:
+          continue
+        name_end = data.find(b"\0", strtab + name)
+        functions[value] = (value, value + length,
+                            data[strtab + name:name_end].decode("utf-8",
+                                                                "replace"))
+    return e_type == ET_DYN, sorted(functions.values())
+  finally:
+    data.close()
+
+# Identifier of the program's executable
+def program_key():
+  progspace = gdb.current_progspace()
+  for objfile in gdb.objfiles():
+    if objfile.filename == progspace.filename:
+      return getattr(objfile, "build_id", None) or objfile.filename
+  return progspace.filename
+
+# Functions of the program's executable, at the addresses GDB uses
+def program_functions():
+  path = gdb.current_progspace().filename
+  if path is None:
+    raise gdb.GdbError("No executable loaded. Use the file command first.")
+  pie, functions = elf_functions(path)
+  if not pie or len(functions) == 0:
+    return functions
+
+  # Position independent executables get relocated when they run
+  named = dict((name, start) for start, end, name in functions)
+  name = "main" if "main" in named else functions[0][2]
+  try:
+    bias = int(gdb.parse_and_eval("'" + name + "'").address) - named[name]
+  except gdb.error:
+    bias = 0
+  return [(start + bias, end + bias, name) for start, end, name in functions]
+
+# Functions of the program sorted by address, to find the one containing
+# an address with a binary search
+class FunctionTable(object):
+
+  def __init__(self, functions):
+    self.functions = functions  # sorted (start, end, name)
+    self.starts = [start for start, end, name in functions]
+
+  # (start, end, name) of the function containing addr, or None
+  def find(self, addr):
+    i = bisect.bisect_right(self.starts, addr) - 1
+    if i >= 0 and addr < self.functions[i][1]:
+      return self.functions[i]
+    return None
+
+  # Patching code does not change the symbol table
+  def overlaps(self, start, end):
+    return False
+
+# FunctionTable of the program, read once. Empty if the executable
+# cannot be read (remote targets, no file loaded).
+def function_table():
+  try:
+    return analysis_cache.program("functions",
+                                  lambda: FunctionTable(program_functions()))
+  except (gdb.GdbError, EnvironmentError, ValueError, struct.error):
+    return FunctionTable([])
+
+
+
+# ======= Call Graph =======
+# Direct calls (and tail jumps) between the functions of the program.
+# Recursive cycles are the strongly connected components of the graph
+# that have more than one function or a function calling itself. They
+# are found with Tarjan's algorithm, in time linear in the size of the
+# graph.
+
+# Does [start, end) overlap one of functions, a sorted list of (start,
+# end, name) whose starts are in starts?
+def functions_overlap(functions, starts, start, end):
+  i = bisect.bisect_right(starts, start) - 1
+  if i >= 0 and start < functions[i][1]:
+    return True
+  return i + 1 < len(starts) and starts[i + 1] < end
+
+# Direct call or jump, as printed by GDB: callq 0x4005e8 <fopen@plt>
+BRANCH_TARGET = re.compile(r"(?:(?:bnd|notrack)\s+)?(call|jmp)q?\s+0x([0-9a-f]+)")
+
+class CallGraph(object):
+
+  def __init__(self, functions):
+    self.functions = functions  # sorted (start, end, name)
+    self.starts = [start for start, end, name in functions]
+    index = dict((start, i) for i, start in enumerate(self.starts))
+    arch = current_architecture()
+
+    # (call site, callee) for the calls made by each function
+    self.calls = []
+    self.edges = 0
+    for start, end, name in functions:
+      sites = []
+      try:
+        instructions = arch.disassemble(start, end - 1)
+      except gdb.error:
+        instructions = []
+      for insn in instructions:
+        match = BRANCH_TARGET.match(insn["asm"])
+        if match is None:
+          continue
+        target = int(match.group(2), 16)
+        callee = index.get(target)
+        # jumps inside the function are not calls
+        if callee is None or \
+            (match.group(1) == "jmp" and start < target < end):
+          continue
+        sites.append((insn["addr"], callee))
+      self.calls.append(sites)
+      self.edges += len(sites)
+
+  # Does [start, end) overlap the code of the program?
+  def overlaps(self, start, end):
+    return functions_overlap(self.functions, self.starts, start, end)
+
+  # Name and offset of an address, like <main+12>
+  def describe(self, addr):
+    i = bisect.bisect_right(self.starts, addr) - 1
+    if i < 0:
+      return hex(addr)
+    return "%s <%s+%d>" % (hex(addr), self.functions[i][2],
+                           addr - self.functions[i][0])
+
+  # Strongly connected components (Tarjan), as lists of function indexes
+  def components(self):
+    n = len(self.functions)
+    order = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+    for root in xrange(n):
+      if order[root] != -1:
+        continue
+      order[root] = low[root] = counter
+      counter += 1
+      stack.append(root)
+      on_stack[root] = True
+      work = [(root, 0)]
+      while work:
+        v, i = work[-1]
+        calls = self.calls[v]
+        while i < len(calls):
+          w = calls[i][1]
+          i += 1
+          if order[w] == -1:
+            # visit w, come back to v afterwards
+            work[-1] = (v, i)
+            order[w] = low[w] = counter
+            counter += 1
+            stack.append(w)
+            on_stack[w] = True
+            work.append((w, 0))
+            break
+          elif on_stack[w] and order[w] < low[v]:
+            low[v] = order[w]
+        else:
+          work.pop()
+          if work:
+            u = work[-1][0]
+            if low[v] < low[u]:
+              low[u] = low[v]
+          if low[v] == order[v]:
+            component = []
+            while True:
+              w = stack.pop()
+              on_stack[w] = False
+              component.append(w)
+              if w == v:
+                break
+            components.append(component)
+    return components
+
+  # Recursive cycles, as sorted lists of function indexes
+  def cycles(self):
+    cycles = []
+    for component in self.components():
+      if len(component) > 1 or \
+          any(callee == component[0] for site, callee in
+              self.calls[component[0]]):
+        cycles.append(sorted(component))
+    cycles.sort()
+    return cycles
+
+# Call graph of the whole program
+def build_call_graph():
+  return CallGraph(program_functions())
+
+
+
+# ======= Whole Program Loops =======
+# show loops --all finds the loops of every function of the program.
+# GDB can only be used from its own thread, so the functions are decoded
+# here, one after the other, and sent in batches of LOOP_BATCH to a pool
+# of worker processes that build their control flow graphs and loops
+# (see sgdblib.flow.loop_summaries) while the next batch is decoded.
+
+LOOP_BATCH = 64
+
+class ProgramLoops(object):
+
+  def __init__(self, functions, jobs):
+    start_time = time.time()
+    self.functions = functions  # sorted (start, end, name)
+    self.starts = [start for start, end, name in functions]
+    arch = current_architecture()
+    pool = None
+    if jobs > 1 and len(functions) > LOOP_BATCH:
+      try:
+        pool = multiprocessing.Pool(jobs)
+      except OSError:
+        pool = None
+    self.jobs = jobs if pool is not None else 1
+    results = []
+    batch = []
+    try:
+      for start, end, name in functions:
+        try:
+          lines = [(insn["addr"], insn["length"], insn["asm"])
+                   for insn in arch.disassemble(start, end - 1)]
+        except gdb.error:
+          continue
+        batch.append((name, start, end, lines))
+        if len(batch) == LOOP_BATCH:
+          if pool is None:
+            results.append(loop_summaries(batch))
+          else:
+            results.append(pool.apply_async(loop_summaries, (batch,)))
+          batch = []
+      if batch:
+        results.append(loop_summaries(batch))
+      if pool is not None:
+        results = [r if isinstance(r, list) else r.get() for r in results]
+        pool.close()
+    finally:
+      if pool is not None:
+        pool.terminate()
+        pool.join()
+    self.summaries = [summary for result in results for summary in result]
+    self.seconds = time.time() - start_time
+
+  # Does [start, end) overlap the code of the program?
+  def overlaps(self, start, end):
+    return functions_overlap(self.functions, self.starts, start, end)
+
+# Loops of every function of the program, analyzed by jobs processes
+def find_program_loops(jobs):
+  return ProgramLoops(program_functions(), jobs)
+
+
+
+# ======= Analysis Cache =======
+# Decoded functions and their analyses (loops, recursive calls) are kept
+# in memory so that repeating a command does not decode and analyze the
+# function again. Entries are keyed by the objfile (its build-id when
+# available) and the function range, evicted in LRU order once the
+# cache grows past its size limit, and dropped when objfiles are loaded
+# or unloaded or when code memory is modified. Whole program analyses
+# are evicted the same way within a limit of their own, so that one of
+# them, which can be as large as all the functions together, does not
+# push every function out.
+
+# Identifier of the objfile holding an address
+def objfile_key(addr):
+  progspace = gdb.current_progspace()
+  objfile = None
+  if hasattr(progspace, "objfile_for_address"):
+    objfile = progspace.objfile_for_address(addr)
+  else:
+    filename = gdb.solib_name(addr) or progspace.filename
+    for o in gdb.objfiles():
+      if o.filename == filename:
+        objfile = o
+        break
+  if objfile is None:
+    return progspace.filename
+  return getattr(objfile, "build_id", None) or objfile.filename
+
+# Containers with more items are measured on SAMPLE_SIZE of them
+SAMPLED_ITEMS = 1024
+SAMPLE_SIZE = 64
+
+# Bytes used by an item of a large container and by the values it holds
+# directly. Objects it points to (the successors of a basic block) are
+# usually items of the same container and are not followed.
+def item_size(item):
+  size = sys.getsizeof(item)
+  if isinstance(item, (list, tuple)):
+    values = item
+  elif isinstance(item, dict):
+    values = item.values()
+  elif hasattr(item, "__dict__"):
+    size += sys.getsizeof(item.__dict__)
+    values = item.__dict__.values()
+  else:
+    return size
+  for value in values:
+    size += sys.getsizeof(value)
+  return size
+
+# Approximate number of bytes used by an object and everything it
+# references. The items of large containers (the instructions of a
+# function, the blocks of its CFG) look alike, so only a sample of them
+# is measured. Decoded functions referenced by an analysis are measured
+# on their own by the cache.
+def approximate_size(obj):
+  size = 0
+  seen = set()
+  stack = [obj]
+  while stack:
+    o = stack.pop()
+    if id(o) in seen or isinstance(o, gdb.Block):
+      continue
+    if isinstance(o, Disassembly) and o is not obj:
+      continue
+    seen.add(id(o))
+    size += sys.getsizeof(o)
+    if isinstance(o, dict):
+      items = o.keys() + o.values()
+    elif isinstance(o, (list, tuple, set, frozenset)):
+      items = list(o)
+    elif hasattr(o, "__dict__"):
+      stack.append(o.__dict__)
+      continue
+    else:
+      continue
+    if len(items) <= SAMPLED_ITEMS:
+      stack.extend(items)
+      continue
+    sample = items[::len(items) // SAMPLE_SIZE]
+    size += sum(item_size(item) for item in sample) * \
+        len(items) // len(sample)
+  return size
+
+class AnalysisCache(object):
+
+  def __init__(self, limit=64 * 1024 * 1024,
+               program_limit=64 * 1024 * 1024):
+    self.limit = limit             # bytes
+    self.entries = OrderedDict()   # key -> Disassembly, oldest first
+    self.sizes = {}                # key -> bytes
+    self.size = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.invalidations = 0
+    self.programs = OrderedDict()  # (objfile, name) -> (analysis, bytes)
+    self.program_limit = program_limit
+    self.program_size = 0
+
+  # Decoded function named by arg (see function_range)
+  def function(self, arg):
+    name, start, end = function_range(arg)
+    key = (objfile_key(start), start, end)
+    function = self.lookup(key)
+    if function is not None:
+      self.hits += 1
+      return function
+    self.misses += 1
+    return self.add(key, name, decode(start, end))
+
+  # Cached function of a key, None if it was not decoded yet
+  def lookup(self, key):
+    function = self.entries.pop(key, None)
+    if function is not None:
+      self.entries[key] = function
+    return function
+
+  # Keep a function decoded from key[1] to key[2] (see PreAnalysis)
+  def add(self, key, name, instructions):
+    function = Disassembly(name, key[1], key[2], instructions)
+    function.key = key
+    self.entries[key] = function
+    self.sizes[key] = approximate_size(function.instructions)
+    self.size += self.sizes[key]
+    self.evict()
+    return function
+
+  # Result of analyze(function), computed once per cached function
+  def analysis(self, function, name, analyze):
+    if name in function.analyses:
+      self.hits += 1
+      return function.analyses[name]
+    self.misses += 1
+    result = analyze(function)
+    function.analyses[name] = result
+    key = getattr(function, "key", None)
+    if key in self.entries:
+      size = approximate_size(result)
+      self.sizes[key] += size
+      self.size += size
+      self.evict()
+    return result
+
+  # Result of analyze(), computed once for the whole program
+  def program(self, name, analyze):
+    key = (program_key(), name)
+    entry = self.programs.pop(key, None)
+    if entry is not None:
+      self.programs[key] = entry
+      self.hits += 1
+      return entry[0]
+    self.misses += 1
+    result = analyze()
+    size = approximate_size(result)
+    self.programs[key] = (result, size)
+    self.program_size += size
+    self.evict_programs()
+    return result
+
+  # Drop the least recently used entries until the cache fits its limit
+  def evict(self):
+    while self.size > self.limit and len(self.entries) > 1:
+      key, function = self.entries.popitem(last=False)
+      self.size -= self.sizes.pop(key)
+      self.evictions += 1
+
+  # Same for the whole program analyses, within their own limit
+  def evict_programs(self):
+    while self.program_size > self.program_limit and len(self.programs) > 1:
+      key, (analysis, size) = self.programs.popitem(last=False)
+      self.program_size -= size
+      self.evictions += 1
+
+  # Drop the entries matching a predicate on (objfile, start, end)
+  def invalidate(self, match=None):
+    for key in list(self.entries.keys()):
+      if match is None or match(key):
+        del self.entries[key]
+        self.size -= self.sizes.pop(key)
+        self.invalidations += 1
+
+  # Drop the whole program analyses matching a predicate on
+  # (objfile, analysis)
+  def invalidate_programs(self, match=None):
+    for key in list(self.programs.keys()):
+      if match is None or match(key, self.programs[key][0]):
+        self.program_size -= self.programs.pop(key)[1]
+        self.invalidations += 1
+
+  def clear(self):
+    self.invalidate()
+    self.invalidate_programs()
+
+  # gdb.events.new_objfile: the objfile may have been rebuilt or relocated
+  def on_new_objfile(self, event):
+    objfile = event.new_objfile
+    keys = set([objfile.filename, getattr(objfile, "build_id", None)])
+    self.invalidate(lambda key: key[0] in keys)
+    self.invalidate_programs(lambda key, analysis: key[0] in keys)
+
+  # gdb.events.clear_objfiles: the whole program space is reset
+  def on_clear_objfiles(self, event):
+    self.clear()
+
+  # gdb.events.memory_changed: code may have been patched
+  def on_memory_changed(self, event):
+    start = int(event.address)
+    end = start + event.length
+    self.invalidate(lambda key: key[1] < end and start < key[2])
+    self.invalidate_programs(lambda key, analysis: analysis.overlaps(start, end))
+
+analysis_cache = AnalysisCache()
+
+
+
+# Text of an analysis rendered by render(function) without the current
+# instruction marker, computed once per function and color mode, with
+# the marker of pc added (see format_instruction)
+def rendered(function, name, render, pc=None):
+  text = analysis_cache.analysis(function, ("render", name, colors.enabled),
+                                 render)
+  if pc is not None and function.contains(pc):
+    line = "   0x%016x <" % pc
+    text = text.replace(line, "=> " + line[3:], 1)
+  return text
+
+# show loops command
+# Task: decode the function, find the natural loops of its control
+# flow graph, and color the lines of each loop
+def show_loops(arg, from_tty):
+  words = arg.split()
+  if words[:1] == ["--all"]:
+    show_all_loops(words[1:])
+    return
+  if "--heat" in words:
+    words.remove("--heat")
+    show_loop_heat(" ".join(words))
+    return
+  if "--samples" in words:
+    words.remove("--samples")
+    show_loop_samples(" ".join(words))
+    return
+  if "--coverage" in words:
+    words.remove("--coverage")
+    show_loop_coverage(" ".join(words))
+    return
+  function = analysis_cache.function(arg)
+  write(rendered(function, "loops", render_loop_report, current_pc()))
+
+# Text shown by show loops
+def render_loop_report(function):
+  out = ["Looking for loops...\n"]
+  forest = analysis_cache.analysis(function, "loops", LoopForest)
+  for loop in forest.preorder():
+    out.append(colors.color_list[1] + "  " * (loop.depth - 1) + \
+    "We found a loop! Loop " + str(loop.number) + \
+    " starts at " + str(hex(loop.header.start)) + \
+    ", goes back to its start from " + \
+    ", ".join(hex(function.instructions[latch.last].addr)
+              for latch in loop.latches) + \
+    " and exits to " + \
+    (", ".join(sorted(set(hex(dst.start) for src, dst in loop.exits)))
+     or "nowhere") + \
+    " (depth " + str(loop.depth) + ")" + colors.nc)
+  out.append("")
+
+  # Colored/non-colored instructions
+  intervals, annotations = loop_overlay(forest)
+  out.extend(render_loops(function, intervals, annotations))
+  return "\n".join(out) + "\n"
+
+# show loops --heat: the loops of a function with the number of times
+# each instruction ran in the last trace (see sgdblib.trace)
+def show_loop_heat(arg):
+  from sgdblib.trace import tracer
+  if tracer.total == 0:
+    raise gdb.GdbError("Nothing traced yet. Use itrace start first.")
+  function = analysis_cache.function(arg)
+  counts = tracer.counts()
+  out = Output()
+  out.line("Instructions of %s run in the last %d traced (itrace start)\n"
+           % (function.name, tracer.recorded()))
+  out.extend(render_heat(function, counts, lambda count: "%9d" % count,
+                         current_pc()))
+  out.flush()
+
+# show loops --samples: the loops of a function with the share of the
+# samples of the last profile sample taken on each instruction (see
+# sgdblib.sampling)
+def show_loop_samples(arg):
+  from sgdblib.sampling import sampler
+  if sampler.samples == 0:
+    raise gdb.GdbError("No samples yet. Use profile sample first.")
+  function = analysis_cache.function(arg)
+  taken = sum(sampler.pcs.get(insn.addr, 0)
+              for insn in function.instructions)
+  out = Output()
+  out.line("%.1f%% of the %d samples were taken in %s (profile sample)\n"
+           % (sampler.percent(taken), sampler.samples, function.name))
+  out.extend(render_heat(function, sampler.pcs,
+                         lambda count: "%6.1f%%" % sampler.percent(count)
+                         if count else " " * 7, current_pc()))
+  out.flush()
+
+# show loops --coverage: the loops of a function with the blocks that
+# did not run since coverage start dimmed (see sgdblib.counting)
+def show_loop_coverage(arg):
+  from sgdblib.counting import block_coverage
+  if not block_coverage.functions:
+    raise gdb.GdbError("No coverage yet. Use coverage start first.")
+  function = analysis_cache.function(arg)
+  forest = analysis_cache.analysis(function, "loops", LoopForest)
+  intervals, annotations = loop_overlay(forest)
+  pc = current_pc()
+  ran = [block_coverage.ran(block.start) for block in forest.blocks]
+  out = Output()
+  if all(block is None for block in ran):
+    out.line("The blocks of %s are not measured: use coverage start %s." %
+             (function.name, function.name))
+  else:
+    out.line("%d of %d blocks of %s ran (coverage start)\n" %
+             (ran.count(True), len(ran), function.name))
+  columns = {True: "   ran", False: " never", None: "      "}
+  for block, block_ran in zip(forest.blocks, ran):
+    for insn in function.instructions[block.first:block.last + 1]:
+      line = columns[block_ran] + " " + format_instruction(insn, function, pc)
+      notes = annotations.get(insn.addr)
+      if notes:
+        line += "\t# " + "; ".join(notes)
+      if block_ran is False:
+        line = colors.dim + line + colors.nc
+      out.line(line)
+  out.flush()
+
+# show recursion command
+def show_recursion(arg, from_tty):
+  if arg.strip() == "--all":
+    show_all_recursion()
+    return
+  # decode the function
+  function = analysis_cache.function(arg)
+  write(rendered(function, "recursion", render_recursion_report,
+                 current_pc()))
+
+# Text shown by show recursion
+def render_recursion_report(function):
+  out = ["Looking for recursive calls...\n"]
+  calls = analysis_cache.analysis(function, "recursion", recursive_calls)
+  color = 0
+  for insn in function.instructions:
+    line = format_instruction(insn, function)
+    # If the call goes to the function entry, it's recursive!
+    if insn.addr in calls:
+      out.append(colors.color_list[1] + \
+      "We found a recursive call! @" + str(insn.addr) + colors.nc)
+      # Color the disas output line
+      line = colors.u + \
+          colors.bold + \
+          colors.color_list[color] + \
+          line + \
+          "\t# this is a recursive call!" + colors.nc
+      # Update the color pointer to the next color
+      if color+1 == len(colors.color_list):
+        color = 0
+      else:
+        color += 1
+    out.append(line)
+  return "\n".join(out) + "\n"
+
+# Columns of show loops --all that it can be sorted by, largest first
+LOOP_COLUMNS = {"loops": lambda s: (-s.loops, -s.depth, s.name),
+                "depth": lambda s: (-s.depth, -s.loops, s.name),
+                "body": lambda s: (-s.body, s.name),
+                "size": lambda s: (-s.instructions, s.name),
+                "name": lambda s: (s.name, s.start),
+                "address": lambda s: s.start}
+
+# Table of the loops of every function of the program
+def show_all_loops(words):
+  sort = "loops"
+  top = None
+  jobs = multiprocessing.cpu_count()
+  usage = "Usage: show loops --all [--sort %s] [--top <n>] [--jobs <n>]" % \
+      "|".join(sorted(LOOP_COLUMNS))
+  while words:
+    if len(words) < 2 or words[0] not in ("--sort", "--top", "--jobs") or \
+        (words[0] == "--sort" and words[1] not in LOOP_COLUMNS) or \
+        (words[0] != "--sort" and not words[1].isdigit()):
+      raise gdb.GdbError(usage)
+    if words[0] == "--sort":
+      sort = words[1]
+    elif words[0] == "--top":
+      top = int(words[1])
+    else:
+      jobs = max(1, int(words[1]))
+    words = words[2:]
+
+  out = Output()
+  out.line("Looking for loops in the whole program...\n")
+  fresh = []
+  def analyze():
+    fresh.append(True)
+    return find_program_loops(jobs)
+  report = analysis_cache.program("loops", analyze)
+  summaries = sorted([s for s in report.summaries if s.loops > 0],
+                     key=LOOP_COLUMNS[sort])
+  shown = summaries if top is None else summaries[:top]
+  out.line(colors.bold + "%-32s %-18s %8s %6s %6s %9s" % (
+      "Function", "Address", "Insns", "Loops", "Depth", "In loops") +
+      colors.nc)
+  for s in shown:
+    color = colors.color_list[(s.depth - 1) % len(colors.color_list)]
+    out.line(color + "%-32s 0x%016x %8d %6d %6d %9d" % (
+        s.name[:32], s.start, s.instructions, s.loops, s.depth, s.body) +
+        colors.nc)
+  if len(shown) < len(summaries):
+    out.line("... %d more (use --top)" % (len(summaries) - len(shown)))
+  out.line()
+  if fresh:
+    timing = "%.2fs, %d processes" % (report.seconds, report.jobs)
+  else:
+    # --jobs does not apply to a report found in the cache
+    timing = "from the cache, use sgdb cache clear to analyze again"
+  out.line(colors.color_list[1] + "We found " +
+           str(sum(s.loops for s in summaries)) + " loops in " +
+           str(len(summaries)) + " of " + str(len(report.summaries)) +
+           " functions (" + timing + ")." + colors.nc)
+  out.flush()
+
+# Report every recursive cycle in the program's call graph
+def show_all_recursion():
+  out = Output()
+  out.line("Looking for recursive calls in the whole program...\n")
+  start_time = time.time()
+  graph = analysis_cache.program("call graph", build_call_graph)
+  cycles = graph.cycles()
+  elapsed = time.time() - start_time
+  for number, cycle in enumerate(cycles):
+    color = colors.color_list[number % len(colors.color_list)]
+    members = set(cycle)
+    names = [graph.functions[i][2] for i in cycle]
+    if len(cycle) == 1:
+      kind = "recursive function"
+    else:
+      kind = "mutual recursion between " + str(len(cycle)) + " functions"
+    out.line(colors.bold + color + "Cycle " + str(number + 1) + " (" + \
+        kind + "): " + ", ".join(names) + colors.nc)
+    # Calls that stay inside the cycle
+    for i in cycle:
+      for site, callee in graph.calls[i]:
+        if callee in members:
+          out.line(color + "   " + graph.describe(site) + " -> " + \
+              graph.functions[callee][2] + colors.nc)
+    out.line()
+  out.line(colors.color_list[1] + "We found " + str(len(cycles)) + \
+      " recursive cycles in " + str(len(graph.functions)) + \
+      " functions and " + str(graph.edges) + " calls (%.2fs)." % elapsed + \
+      colors.nc)
+  out.flush()
+
+# sgdb cache stats command
+def cache_stats(arg, from_tty):
+  cache = analysis_cache
+  lookups = cache.hits + cache.misses
+  out = Output()
+  out.line(colors.bold + "Analysis cache" + colors.nc)
+  out.line("  functions     : %d" % len(cache.entries))
+  out.line("  programs      : %d" % len(cache.programs))
+  out.line("  hits          : %d" % cache.hits)
+  out.line("  misses        : %d" % cache.misses)
+  if lookups > 0:
+    out.line("  hit rate      : %.1f%%" % (100.0 * cache.hits / lookups))
+  out.line("  evictions     : %d" % cache.evictions)
+  out.line("  invalidations : %d" % cache.invalidations)
+  out.line("  memory used   : %.1f KiB of %.1f KiB" % (cache.size / 1024.0,
+                                                     cache.limit / 1024.0))
+  out.line("  program memory: %.1f KiB of %.1f KiB" %
+           (cache.program_size / 1024.0, cache.program_limit / 1024.0))
+  out.flush()
+
+# sgdb cache clear command
+def cache_clear(arg, from_tty):
+  analysis_cache.clear()
+  write("Analysis cache cleared.\n")
@@ -0,0 +1,58 @@
+#################################################
+# S-GDB : shared helpers                        #
+#################################################
+
+# Imports
+import os
+
+
+
+# ======= AUX Structures =======
+# Colors  
+class colors():
+  red = "\033[31m"
+  green = "\033[32m"
+  yellow = "\033[33m"
+  blue = "\033[34m"
+  pink = "\033[35m"
+  cyan = "\033[36m"
+  bold = "\033[1m"
+  dim = "\033[2m"
+  u = "\033[4m"
+  i = "\033[3m"
+  nc = "\033[0m"
+  color_list = [red, green, yellow, blue, pink, cyan]
+  # From the coldest to the hottest code
+  heat = [blue, cyan, green, yellow, red]
+
+  # ANSI sequence of each color, used when colors are turned back on
+  codes = dict(red=red, green=green, yellow=yellow, blue=blue, pink=pink,
+               cyan=cyan, bold=bold, dim=dim, u=u, i=i, nc=nc)
+  enabled = True
+
+  # Turn colors on or off (every color becomes "" when off)
+  @classmethod
+  def enable(cls, enabled=True):
+    cls.enabled = enabled
+    for name, code in cls.codes.items():
+      setattr(cls, name, code if enabled else "")
+    cls.color_list = [cls.red, cls.green, cls.yellow, cls.blue, cls.pink,
+                      cls.cyan]
+    cls.heat = [cls.blue, cls.cyan, cls.green, cls.yellow, cls.red]
+
+# No colors for people who asked for none (https://no-color.org)
+if "NO_COLOR" in os.environ:
+  colors.enable(False)
+
+# Check that input is a number
+def is_num(i):
+  try:
+    int(i)
+    return True
+  except ValueError:
+    return False
+
+# Stop executing the python script
+def handle_quit(command):
+  if ((command == "q") or (command == "quit")):
+    exit()
@@ -0,0 +1,501 @@
+#################################################
+# S-GDB : run-time counts with breakpoints      #
+#################################################
+
+# Imports
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import time
+from sgdblib.analysis import analysis_cache, current_architecture
+from sgdblib.analysis import make_instruction, program_functions
+from sgdblib.common import colors
+from sgdblib.flow import JUMPS, RETURNS, Disassembly, LoopForest, build_cfg
+from sgdblib.output import Output, write
+
+
+
+# ======= Counting Breakpoints =======
+# Breakpoints whose stop() counts the hit and returns False, so the
+# program never stops at them. They are internal: they do not show in
+# "info breakpoints". Once a breakpoint reaches its limit, saturated()
+# is posted to GDB's event loop, since breakpoints cannot be deleted
+# from stop().
+#
+# They are placed at the addresses of the decoded code, which are only
+# the ones the program runs at once it is loaded (position independent
+# executables are relocated by "run"), so the program has to be running.
+
+# Stop with an error if the program is not being run yet
+def require_process():
+  if gdb.selected_inferior().pid == 0:
+    raise gdb.GdbError("The program is not being run. Start it first.")
+
+class CountingBreakpoint(gdb.Breakpoint):
+
+  def __init__(self, address, limit=0, saturated=None):
+    super(CountingBreakpoint, self).__init__("*0x%x" % address,
+                                             internal=True)
+    self.address = address
+    self.hits = 0
+    self.limit = limit
+    self.saturated = saturated
+
+  def stop(self):
+    self.hits += 1
+    if self.hits == self.limit:
+      gdb.post_event(lambda: self.saturated(self))
+    return False
+
+  # Delete the breakpoint, if GDB did not already
+  def remove(self):
+    if self.is_valid():
+      self.delete()
+
+
+
+# ======= Loop Trip Counts =======
+# A breakpoint counts the executions H of each loop header. Back-edges
+# are counted at the instruction ending the latch block: when it is a
+# jmp or falls through to the header, each execution takes the edge.
+# When it is a conditional jump, the block it goes to when leaving the
+# loop is counted too, and the edge was taken the difference of times.
+# Entries into the loop are E = H - B for B back-edge traversals, and
+# B / E iterations are made per entry.
+#
+# Once a breakpoint has been hit limit times, the counts of the loops
+# using it are kept as they are, and the breakpoints no loop needs
+# anymore are deleted, so hot loops stop slowing the program down.
+
+# Default number of hits after which a loop is only sampled
+LOOP_LIMIT = 100000
+
+# Counted executions of a back-edge: [(address, sign)] summed, or None
+# if the edge cannot be counted with breakpoints
+def back_edge_terms(forest, latch, header):
+  insn = forest.function.instructions[latch.last]
+  if insn.mnemonic == "jmp" or insn.mnemonic not in JUMPS or \
+      len(latch.successors) == 1:
+    return [(insn.addr, 1)]
+  others = [block for block in latch.successors if block is not header]
+  if len(others) == 1 and len(others[0].predecessors) == 1:
+    return [(insn.addr, 1), (others[0].start, -1)]
+  return None
+
+class LoopCounter(object):
+
+  def __init__(self, loop, header, back_edges):
+    self.loop = loop
+    self.header = header          # address counting H
+    self.back_edges = back_edges  # [[(address, sign)]], None if unknown
+    self.addresses = set([header])
+    for terms in back_edges or []:
+      self.addresses.update(address for address, sign in terms)
+    self.frozen = None            # counts at the time it was sampled
+
+  def counts(self, breakpoints):
+    if self.frozen is not None:
+      return self.frozen
+    return dict((address, breakpoints[address].hits)
+                for address in self.addresses)
+
+  # (H, B) with B None if a back-edge could not be counted
+  def totals(self, breakpoints):
+    counts = self.counts(breakpoints)
+    if self.back_edges is None:
+      return counts[self.header], None
+    return counts[self.header], sum(counts[address] * sign
+                                    for terms in self.back_edges
+                                    for address, sign in terms)
+
+class LoopProfile(object):
+
+  def __init__(self, function, limit):
+    self.function = function
+    self.limit = limit
+    forest = analysis_cache.analysis(function, "loops", LoopForest)
+    self.loops = []
+    for loop in forest.loops:
+      back_edges = []
+      for latch in loop.latches:
+        terms = back_edge_terms(forest, latch, loop.header)
+        if terms is None:
+          back_edges = None
+          break
+        back_edges.append(terms)
+      self.loops.append(LoopCounter(loop, loop.header.start, back_edges))
+    self.breakpoints = {}
+    for counter in self.loops:
+      for address in counter.addresses:
+        if address not in self.breakpoints:
+          self.breakpoints[address] = CountingBreakpoint(
+              address, limit, self.saturated)
+
+  # A breakpoint reached the limit: keep the counts of its loops and
+  # delete the breakpoints they were the last to use
+  def saturated(self, breakpoint):
+    for counter in self.loops:
+      if counter.frozen is None and breakpoint.address in counter.addresses:
+        counter.frozen = counter.counts(self.breakpoints)
+    needed = set()
+    for counter in self.loops:
+      if counter.frozen is None:
+        needed |= counter.addresses
+    for address, other in self.breakpoints.items():
+      if address not in needed:
+        other.remove()
+
+  def stop(self):
+    for breakpoint in self.breakpoints.values():
+      breakpoint.remove()
+
+  def report(self):
+    function = self.function
+    out = Output()
+    out.line(colors.bold + "Loops of %s (%d breakpoints)" %
+             (function.name, len(self.breakpoints)) + colors.nc)
+    if not self.loops:
+      out.line("  No loops.")
+    else:
+      out.line("  %-5s %-28s %5s %10s %12s %10s" % (
+          "Loop", "Header", "Depth", "Entries", "Iterations", "Per entry"))
+    for counter in self.loops:
+      loop = counter.loop
+      header, back = counter.totals(self.breakpoints)
+      where = "0x%x <+%d>" % (loop.header.start,
+                              loop.header.start - function.start)
+      color = colors.color_list[(loop.number - 1) % len(colors.color_list)]
+      if back is None:
+        numbers = "%10s %12s %10s" % ("?", "%d*" % header, "?")
+      else:
+        entries = header - back
+        numbers = "%10d %12d %10s" % (
+            entries, back,
+            "%.1f" % (float(back) / entries) if entries > 0 else "-")
+      if counter.frozen is not None:
+        numbers += " (sampled)"
+      out.line(color + "  %-5d %-28s %5d " % (loop.number, where,
+                                             loop.depth) +
+               numbers + colors.nc)
+    if any(counter.back_edges is None for counter in self.loops):
+      out.line("  * header executions: a back-edge of the loop could not "
+               "be counted")
+    out.flush()
+
+loop_profile = None
+
+# profile loops command
+def profile_loops(arg, from_tty):
+  global loop_profile
+  words = arg.split()
+  if len(words) == 0:
+    if loop_profile is None:
+      raise gdb.GdbError("Usage: profile loops <function> [<limit>]")
+    loop_profile.report()
+    return
+  if words == ["stop"]:
+    if loop_profile is None:
+      raise gdb.GdbError("No loops are being counted.")
+    loop_profile.stop()
+    loop_profile.report()
+    loop_profile = None
+    return
+  limit = LOOP_LIMIT
+  if len(words) == 2 and words[1].isdigit():
+    limit = int(words[1])
+  elif len(words) != 1:
+    raise gdb.GdbError("Usage: profile loops <function> [<limit>]")
+  require_process()
+  if loop_profile is not None:
+    loop_profile.stop()
+    loop_profile = None
+  function = analysis_cache.function(words[0])
+  loop_profile = LoopProfile(function, limit)
+  write("Counting %d loops of %s with %d breakpoints. Continue the "
+        "program, then use profile loops to see the counts.\n" %
+        (len(loop_profile.loops), function.name,
+         len(loop_profile.breakpoints)))
+
+
+
+# ======= Recursion Depth =======
+# A breakpoint on the entry of the function adds one to the depth and a
+# breakpoint on each of its ret instructions takes one away, so each
+# event is O(1). The calls made at each depth make the histogram. The
+# stack used by one call is the return address, the registers pushed by
+# the prologue and the "sub $N,%rsp" that makes room for the locals.
+# Leaving the function otherwise (longjmp, tail jumps) is not seen.
+
+# Width of the bars of the histogram
+HISTOGRAM_WIDTH = 40
+# Lines of the histogram, deeper calls are grouped
+HISTOGRAM_LINES = 32
+
+# Bytes of stack used by each call of a function
+def frame_size(function):
+  size = 8  # return address
+  for insn in function.instructions:
+    if insn.mnemonic == "push":
+      size += 8
+    elif insn.mnemonic == "sub" and insn.operands.endswith(",%rsp") and \
+        insn.operands.startswith("$"):
+      size += int(insn.operands[1:].split(",")[0], 0)
+      break
+    elif insn.mnemonic not in ("endbr64", "mov", "nop"):
+      break
+  return size
+
+class EntryBreakpoint(CountingBreakpoint):
+
+  def __init__(self, address, profile):
+    super(EntryBreakpoint, self).__init__(address)
+    self.profile = profile
+
+  def stop(self):
+    profile = self.profile
+    profile.depth += 1
+    profile.calls += 1
+    profile.depths += profile.depth
+    if profile.depth == len(profile.histogram):
+      profile.histogram.append(0)
+    profile.histogram[profile.depth] += 1
+    return False
+
+class ReturnBreakpoint(CountingBreakpoint):
+
+  def __init__(self, address, profile):
+    super(ReturnBreakpoint, self).__init__(address)
+    self.profile = profile
+
+  def stop(self):
+    if self.profile.depth > 0:
+      self.profile.depth -= 1
+    return False
+
+class RecursionProfile(object):
+
+  def __init__(self, function):
+    self.function = function
+    self.frame = frame_size(function)
+    self.depth = 0
+    self.calls = 0
+    self.depths = 0         # sum of the depth of each call
+    self.histogram = [0]    # calls made at each depth
+    self.breakpoints = [EntryBreakpoint(function.start, self)]
+    for insn in function.instructions:
+      if insn.mnemonic in RETURNS:
+        self.breakpoints.append(ReturnBreakpoint(insn.addr, self))
+
+  def stop(self):
+    for breakpoint in self.breakpoints:
+      breakpoint.remove()
+
+  def report(self):
+    deepest = len(self.histogram) - 1
+    out = Output()
+    out.line(colors.bold + "Recursion of %s (%d breakpoints)" %
+             (self.function.name, len(self.breakpoints)) + colors.nc)
+    out.line("  calls          : %d" % self.calls)
+    out.line("  deepest        : %d" % deepest)
+    if self.calls > 0:
+      out.line("  average depth  : %.1f" % (float(self.depths) / self.calls))
+    out.line("  current depth  : %d" % self.depth)
+    out.line("  stack at peak  : %d bytes (%d calls of %d bytes)" %
+             (deepest * self.frame, deepest, self.frame))
+    if self.calls == 0:
+      out.flush()
+      return
+    out.line(colors.bold + "  Calls made at each depth" + colors.nc)
+    group = (deepest + HISTOGRAM_LINES - 1) // HISTOGRAM_LINES
+    rows = []
+    for first in xrange(1, deepest + 1, group):
+      last = min(deepest, first + group - 1)
+      rows.append((first, last, sum(self.histogram[first:last + 1])))
+    most = max(count for first, last, count in rows)
+    for first, last, count in rows:
+      depths = str(first) if first == last else "%d-%d" % (first, last)
+      bar = "#" * max(1 if count else 0, count * HISTOGRAM_WIDTH // most)
+      out.line("  %9s %s %d" % (depths, colors.color_list[1] +
+                                bar.ljust(HISTOGRAM_WIDTH) + colors.nc,
+                                count))
+    out.flush()
+
+recursion_profile = None
+
+# profile recursion command
+def profile_recursion(arg, from_tty):
+  global recursion_profile
+  words = arg.split()
+  if len(words) == 0:
+    if recursion_profile is None:
+      raise gdb.GdbError("Usage: profile recursion <function>")
+    recursion_profile.report()
+    return
+  if words == ["stop"]:
+    if recursion_profile is None:
+      raise gdb.GdbError("No recursion is being profiled.")
+    recursion_profile.stop()
+    recursion_profile.report()
+    recursion_profile = None
+    return
+  require_process()
+  if recursion_profile is not None:
+    recursion_profile.stop()
+    recursion_profile = None
+  if len(words) != 1:
+    raise gdb.GdbError("Usage: profile recursion <function>")
+  function = analysis_cache.function(words[0])
+  recursion_profile = RecursionProfile(function)
+  write("Following the calls of %s with %d breakpoints. Continue the "
+        "program, then use profile recursion to see the depths.\n" %
+        (function.name, len(recursion_profile.breakpoints)))
+
+
+
+# ======= Block Coverage =======
+# coverage start places a breakpoint at the head of every basic block of
+# a function, or of every function of the program with --all. They have
+# a limit of one hit: the first one marks the block as covered and
+# deletes the breakpoint, so code that already ran is not slowed down
+# and coverage costs less and less as it saturates. Covered blocks are
+# kept across runs, and coverage start only places breakpoints on the
+# blocks that have not run yet.
+#
+# Placing tens of thousands of breakpoints takes a while in GDB, so they
+# are placed COVERAGE_BATCH at a time with the progress shown, and
+# Ctrl-C stops placing them (the blocks left out are not measured).
+
+COVERAGE_BATCH = 1000
+# Functions listed by coverage, the others are only counted
+COVERAGE_LINES = 20
+
+class Coverage(object):
+
+  def __init__(self):
+    self.functions = {}     # start -> (name, [block starts])
+    self.covered = set()    # block starts that ran
+    self.breakpoints = {}   # block start -> breakpoint not hit yet
+
+  # Place the breakpoints of the blocks of the functions: [(function,
+  # blocks)]. Returns the number placed and if it was interrupted.
+  def start(self, functions):
+    pending = []
+    for function, blocks in functions:
+      starts = [block.start for block in blocks]
+      self.functions[function.start] = (function.name, starts)
+      pending.extend(address for address in starts
+                     if address not in self.covered and
+                     address not in self.breakpoints)
+    placed = 0
+    try:
+      for address in pending:
+        self.breakpoints[address] = CountingBreakpoint(address, 1,
+                                                       self.saturated)
+        placed += 1
+        if placed % COVERAGE_BATCH == 0:
+          write("  %d of %d breakpoints placed\n" % (placed, len(pending)))
+    except KeyboardInterrupt:
+      return placed, True
+    return placed, False
+
+  # First hit of a block
+  def saturated(self, breakpoint):
+    self.covered.add(breakpoint.address)
+    self.breakpoints.pop(breakpoint.address, None)
+    breakpoint.remove()
+
+  # Did the block starting at address run? None if it is not measured
+  def ran(self, address):
+    if address in self.covered:
+      return True
+    if address in self.breakpoints:
+      return False
+    return None
+
+  def stop(self):
+    for breakpoint in self.breakpoints.values():
+      breakpoint.remove()
+    self.breakpoints = {}
+
+  def report(self):
+    rows = []
+    blocks = covered = 0
+    for start, (name, starts) in sorted(self.functions.items()):
+      ran = sum(1 for address in starts if address in self.covered)
+      blocks += len(starts)
+      covered += ran
+      if ran:
+        rows.append((name, start, ran, len(starts)))
+    out = Output()
+    out.line(colors.bold + "Coverage: %d of %d blocks (%.1f%%) in %d "
+             "functions, %d breakpoints left" %
+             (covered, blocks, 100.0 * covered / blocks if blocks else 0,
+              len(self.functions), len(self.breakpoints)) + colors.nc)
+    if rows:
+      out.line("  %-32s %-18s %13s %6s" % ("Function", "Address", "Blocks run",
+                                             "%"))
+    for name, start, ran, total in rows[:COVERAGE_LINES]:
+      out.line("  %-32s 0x%016x %6d/%-6d %5.1f%%" %
+               (name, start, ran, total, 100.0 * ran / total))
+    if len(rows) > COVERAGE_LINES:
+      out.line("  ... and %d more functions that ran" %
+               (len(rows) - COVERAGE_LINES))
+    out.flush()
+
+block_coverage = Coverage()
+
+# Decoded functions of the program and their blocks
+def program_blocks():
+  arch = current_architecture()
+  for start, end, name in program_functions():
+    try:
+      instructions = [make_instruction(insn)
+                      for insn in arch.disassemble(start, end - 1)]
+    except gdb.error:
+      continue
+    function = Disassembly(name, start, end, instructions)
+    yield function, build_cfg(function)
+
+# coverage command
+def coverage(arg, from_tty):
+  words = arg.split()
+  usage = "Usage: coverage start <function>|--all\n" \
+          "       coverage [stop|clear]"
+  if len(words) == 0:
+    if not block_coverage.functions:
+      raise gdb.GdbError(usage)
+    block_coverage.report()
+    return
+  if words == ["stop"]:
+    block_coverage.stop()
+    block_coverage.report()
+    return
+  if words == ["clear"]:
+    block_coverage.stop()
+    block_coverage.__init__()
+    write("Coverage cleared.\n")
+    return
+  if words[0] != "start" or len(words) != 2:
+    raise gdb.GdbError(usage)
+  require_process()
+  start = time.time()
+  if words[1] == "--all":
+    functions = program_blocks()
+  else:
+    function = analysis_cache.function(words[1])
+    forest = analysis_cache.analysis(function, "loops", LoopForest)
+    functions = [(function, forest.blocks)]
+  placed, interrupted = block_coverage.start(functions)
+  write("%s %d breakpoints in %.1fs, %d blocks in %d functions measured. "
+        "Continue the program, then use coverage or show loops "
+        "--coverage to see what ran.\n" %
+        ("Interrupted after placing" if interrupted else "Placed", placed,
+         time.time() - start, len(block_coverage.breakpoints) +
+         len(block_coverage.covered), len(block_coverage.functions)))
+
+# gdb.events.exited: show the profiles of the run
+def on_exited(event):
+  if loop_profile is not None:
+    loop_profile.report()
+  if recursion_profile is not None:
+    recursion_profile.report()
+  if block_coverage.functions:
+    block_coverage.report()
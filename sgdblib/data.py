@@ -0,0 +1,229 @@
+#################################################
+# S-GDB : data types of instruction operands    #
+#################################################
+
+# Imports
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import bisect
+import re
+from sgdblib.analysis import analysis_cache, current_pc, format_instruction
+from sgdblib.common import colors
+from sgdblib.flow import RETURNS
+from sgdblib.output import write
+
+
+
+# ======= Variable Index =======
+# Local variables are found by their offset from %rbp, the register used
+# by -0x18(%rbp) style operands. The offsets are computed once per
+# function, from the selected frame when it is inside the function past
+# its prologue, or from "info scope" otherwise, and kept in a sorted
+# VariableIndex cached with the decoded function (one for each way of
+# finding them). Operands are then resolved with a binary search,
+# without asking GDB about each instruction.
+
+# Memory operand relative to %rbp: -0x18(%rbp), (%rbp), 0x10(%rbp,%rax,1)
+RBP_OPERAND = re.compile(r"(-?0x[0-9a-f]+|-?\d+)?\(%rbp[,)]")
+# Global variable GDB names in a comment: # 0x601040 <counter>
+GLOBAL_COMMENT = re.compile(r"#\s*0x[0-9a-f]+ <([\w.$@]+)(?:\+(\d+))?>")
+# Location printed by info scope when the frame base is a register:
+#   Symbol n is a variable at frame base reg $rbp offset 16+-20, length 4.
+SCOPE_LOCATION = re.compile(r"Symbol (\S+) is .*?\breg \$(\w+) offset "
+                            r"(-?\d+)(?:\+(-?\d+))?, length (\d+)")
+# Location printed by info scope when the frame base is the CFA
+# (DW_OP_call_frame_cfa, what current gcc emits):
+#   Symbol n is a variable a complex DWARF expression:
+#        0: DW_OP_fbreg -20
+#   , length 4.
+SCOPE_FBREG = re.compile(r"Symbol (\S+) is [^\n]*complex DWARF expression:"
+                         r"\s*0: DW_OP_fbreg (-?\d+)\s*, length (\d+)")
+# Offset from %rbp of the CFA, once the prologue did push %rbp and
+# mov %rsp,%rbp (-O0): the return address and the saved %rbp
+CFA_OFFSET = 16
+
+# Offsets from %rbp of the variables of a function
+class VariableIndex(object):
+
+  def __init__(self, variables):
+    # (offset, size, name, type), sorted by offset
+    self.variables = sorted(variables)
+    self.offsets = [variable[0] for variable in self.variables]
+
+  # "name" or "name+n" and the type of the variable at offset
+  def lookup(self, offset):
+    i = bisect.bisect_right(self.offsets, offset) - 1
+    if i < 0:
+      return None
+    start, size, name, type_name = self.variables[i]
+    if offset >= start + max(size, 1):
+      return None
+    if offset == start:
+      return name, type_name
+    return "%s+%d" % (name, offset - start), type_name
+
+# Block of the function's own scope, None without debug info
+def function_block(function):
+  block = gdb.block_for_pc(function.start)
+  while block is not None and block.function is None:
+    block = block.superblock
+  return block
+
+# Variables and arguments declared in a block, by name
+def block_symbols(block):
+  symbols = {}
+  for symbol in block:
+    if symbol.is_variable or symbol.is_argument:
+      symbols.setdefault(symbol.name, symbol)
+  return symbols
+
+# Addresses of the function at which %rbp is its frame pointer: after
+# the "mov %rsp,%rbp" of the prologue, and before the "leave" or
+# "pop %rbp" of each epilogue. Empty if the function does not set %rbp.
+def frame_pointer_addresses(function):
+  addresses = set()
+  prologue = False   # the prologue set %rbp
+  ready = False      # %rbp is set at the next instruction
+  for insn in function.instructions:
+    if ready:
+      addresses.add(insn.addr)
+    if insn.mnemonic == "mov" and insn.operands == "%rsp,%rbp":
+      prologue = ready = True
+    elif insn.mnemonic == "leave" or \
+        (insn.mnemonic == "pop" and insn.operands == "%rbp"):
+      ready = False
+    elif insn.mnemonic in RETURNS or insn.mnemonic == "jmp":
+      # The code after it is reached from elsewhere in the body
+      ready = prologue
+  return frozenset(addresses)
+
+# Selected frame, if it is running the function with %rbp set up
+def function_frame(function):
+  try:
+    frame = gdb.selected_frame()
+  except gdb.error:
+    return None
+  pc = int(frame.pc())
+  if function.contains(pc) and \
+      pc in analysis_cache.analysis(function, "frame pointer",
+                                    frame_pointer_addresses):
+    return frame
+  return None
+
+# (name, offset from %rbp, size) of the variables, from info scope
+def scope_offsets(function):
+  output = gdb.execute("info scope *0x%x" % function.start, to_string=True)
+  offsets = []
+  for match in SCOPE_LOCATION.finditer(output):
+    name, register, base, offset, size = match.groups()
+    if register != "rbp":
+      continue
+    offsets.append((name, int(base) + int(offset or 0), int(size)))
+  for match in SCOPE_FBREG.finditer(output):
+    name, offset, size = match.groups()
+    offsets.append((name, CFA_OFFSET + int(offset), int(size)))
+  return offsets
+
+# VariableIndex of the function's local variables
+def variable_index(function):
+  block = function_block(function)
+  if block is None:
+    return VariableIndex([])
+  # Every nested scope of the function, found by the pc of its code
+  blocks = {}
+  for insn in function.instructions:
+    current = gdb.block_for_pc(insn.addr)
+    while current is not None and current.start >= block.start and \
+        current.end <= block.end:
+      blocks[(current.start, current.end)] = current
+      if current.function is not None:
+        break
+      current = current.superblock
+  symbols = [symbol for scope in blocks.values()
+             for symbol in block_symbols(scope).values()]
+
+  variables = []
+  frame = function_frame(function)
+  if frame is not None:
+    rbp = int(frame.read_register("rbp"))
+    for symbol in symbols:
+      try:
+        address = symbol.value(frame).address
+      except gdb.error:
+        continue
+      if address is None:
+        continue
+      variables.append((int(address) - rbp, symbol.type.sizeof, symbol.name,
+                        str(symbol.type)))
+  else:
+    for name, offset, size in scope_offsets(function):
+      # Nested scopes can declare the same name: prefer the symbol of
+      # the same size
+      named = sorted((symbol for symbol in symbols if symbol.name == name),
+                     key=lambda symbol: symbol.type.sizeof != size)
+      variables.append((offset, size, name,
+                        str(named[0].type) if named else "?"))
+  return VariableIndex(set(variables))
+
+# Name of an analysis of the variables: built from a frame, they are
+# kept apart from the ones built from info scope, so stopping in the
+# function later finds the variables info scope missed
+def variables_key(function, name):
+  if function_frame(function) is not None:
+    return name + " (frame)"
+  return name
+
+# Type of a global variable, None if GDB does not know it
+def global_type(name):
+  try:
+    symbol = gdb.lookup_global_symbol(name)
+  except gdb.error:
+    return None
+  if symbol is None or not symbol.is_variable:
+    return None
+  return str(symbol.type)
+
+# {address: [comments]} naming the variable and type of each operand
+def data_annotations(function):
+  index = analysis_cache.analysis(function,
+                                 variables_key(function, "variables"),
+                                 variable_index)
+  annotations = {}
+  for insn in function.instructions:
+    notes = []
+    for match in RBP_OPERAND.finditer(insn.operands):
+      offset = int(match.group(1) or "0", 0)
+      found = index.lookup(offset)
+      if found is not None:
+        notes.append("%s (%s)" % found)
+    for match in GLOBAL_COMMENT.finditer(insn.operands):
+      type_name = global_type(match.group(1))
+      if type_name is not None:
+        notes.append("%s (%s)" % (match.group(1) + ("+" + match.group(2)
+                                  if match.group(2) else ""), type_name))
+    if notes:
+      annotations[insn.addr] = notes
+  return annotations
+
+
+
+# show data command
+# Task: show the disassembled function with the variable and data type
+# of each memory operand
+def show_data(arg, from_tty):
+  function = analysis_cache.function(arg)
+  annotations = analysis_cache.analysis(function,
+                                        variables_key(function, "data"),
+                                        data_annotations)
+  lines = []
+  if function_block(function) is None:
+    lines.append(colors.yellow + "No debug information for " +
+                 function.name + ", only global variables can be named." +
+                 colors.nc)
+  pc = current_pc()
+  for insn in function.instructions:
+    line = format_instruction(insn, function, pc)
+    notes = annotations.get(insn.addr)
+    if notes:
+      line += "\t" + colors.green + "# " + "; ".join(notes) + colors.nc
+    lines.append(line)
+  write("\n".join(lines) + "\n")
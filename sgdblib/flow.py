@@ -0,0 +1,376 @@
+#################################################
+# S-GDB : control flow analysis                 #
+#################################################
+
+# Imports
+from collections import namedtuple
+
+
+
+# ======= Instructions =======
+# Decoded instructions and the functions holding them. Nothing in this
+# module uses GDB, so the analyses also run in worker processes (see
+# show loops --all) and outside of GDB.
+
+# Prefixes that GDB prints in front of the actual mnemonic
+PREFIXES = frozenset(["rep", "repz", "repe", "repnz", "repne", "lock",
+                      "bnd", "notrack", "data16", "addr32", "cs", "ds",
+                      "es", "fs", "gs", "ss"])
+
+# Conditional and unconditional jumps (without size suffixes)
+JUMPS = frozenset(["jmp", "je", "jz", "jne", "jnz", "js", "jns", "jg",
+                   "jnle", "jge", "jnl", "jl", "jnge", "jle", "jng", "ja",
+                   "jnbe", "jae", "jnb", "jb", "jnae", "jbe", "jna", "jc",
+                   "jnc", "jo", "jno", "jp", "jpe", "jnp", "jpo", "jcxz",
+                   "jecxz", "jrcxz", "loop", "loope", "loopz", "loopne",
+                   "loopnz"])
+
+# Calls and returns (without size suffixes)
+CALLS = frozenset(["call"])
+RETURNS = frozenset(["ret", "iret", "sysret"])
+
+# Mnemonics GDB may print with a q suffix (callq, jmpq, retq)
+SUFFIXED = JUMPS | CALLS | RETURNS
+
+# A decoded instruction
+#  addr : address of the instruction
+#  length : size of the instruction in bytes
+#  mnemonic : operation, without prefixes or size suffix (jmpq -> jmp)
+#  operands : operand string as printed by GDB
+#  target : address of a direct jump/call, None otherwise
+#  asm : full instruction text as printed by GDB
+Instruction = namedtuple("Instruction",
+                         "addr length mnemonic operands target asm")
+
+# Remove the size suffix GDB adds to some mnemonics (callq, jmpq, retq)
+def base_mnemonic(mnemonic):
+  if mnemonic[-1:] == "q" and mnemonic[:-1] in SUFFIXED:
+    return mnemonic[:-1]
+  return mnemonic
+
+# Build an Instruction out of one of the dictionaries returned by
+# gdb.Architecture.disassemble()
+def make_instruction(insn):
+  asm = insn["asm"]
+  fields = asm.split(None, 1)
+  # skip prefixes (rep stos, bnd jmp, ...)
+  while len(fields) > 1 and fields[0] in PREFIXES:
+    fields = fields[1].split(None, 1)
+  if len(fields) == 0:
+    return Instruction(insn["addr"], insn["length"], "", "", None, asm)
+  mnemonic = base_mnemonic(fields[0])
+  operands = fields[1].strip() if len(fields) > 1 else ""
+  target = None
+  # Direct branches look like: jmp 0x400720 <main+100>
+  if (mnemonic in JUMPS or mnemonic in CALLS) and operands[:2] == "0x":
+    try:
+      target = int(operands.split(None, 1)[0], 16)
+    except ValueError:
+      target = None
+  return Instruction(insn["addr"], insn["length"], mnemonic, operands,
+                     target, asm)
+
+# Decoded function
+class Disassembly(object):
+
+  def __init__(self, name, start, end, instructions):
+    self.name = name
+    self.start = start
+    self.end = end
+    self.instructions = instructions
+    self.analyses = {}  # results of the analyses run on the function
+
+  # Is addr inside this function?
+  def contains(self, addr):
+    return self.start <= addr < self.end
+
+
+
+# ======= Control Flow Analysis =======
+# Loops are found as natural loops of the function's control flow graph:
+# an edge u -> h is a back-edge if h dominates u, and the loop is h plus
+# every block that reaches u without going through h. Dominators are
+# computed with the Cooper-Harvey-Kennedy algorithm over the blocks in
+# reverse postorder, which converges in a couple of passes on real code.
+
+# Instructions that end a basic block without a successor
+STOPS = frozenset(["hlt", "ud2"])
+
+# Instructions of a function between two branches
+class BasicBlock(object):
+
+  def __init__(self, number, first, last, start, end):
+    self.number = number  # blocks are numbered in address order
+    self.first = first    # index of the first instruction
+    self.last = last      # index of the last instruction
+    self.start = start    # address of the first instruction
+    self.end = end        # address after the last instruction
+    self.successors = []
+    self.predecessors = []
+
+# Split a decoded function into basic blocks linked by their edges
+def build_cfg(function):
+  instructions = function.instructions
+  if len(instructions) == 0:
+    return []
+  index = dict((insn.addr, i) for i, insn in enumerate(instructions))
+
+  # Find the first instruction of each block
+  leaders = set([0])
+  for i, insn in enumerate(instructions):
+    if insn.mnemonic in JUMPS or insn.mnemonic in RETURNS or \
+        insn.mnemonic in STOPS:
+      leaders.add(i + 1)
+      if insn.target in index:
+        leaders.add(index[insn.target])
+  leaders.discard(len(instructions))
+  leaders = sorted(leaders)
+
+  blocks = []
+  block_at = {}
+  for n, first in enumerate(leaders):
+    if n + 1 < len(leaders):
+      last = leaders[n + 1] - 1
+    else:
+      last = len(instructions) - 1
+    block = BasicBlock(n, first, last, instructions[first].addr,
+                       instructions[last].addr + instructions[last].length)
+    blocks.append(block)
+    block_at[block.start] = block
+
+  # Link the blocks
+  for block in blocks:
+    insn = instructions[block.last]
+    successors = []
+    if insn.mnemonic in JUMPS:
+      if insn.target in block_at:
+        successors.append(block_at[insn.target])
+      if insn.mnemonic != "jmp" and block.number + 1 < len(blocks):
+        successors.append(blocks[block.number + 1])
+    elif insn.mnemonic not in RETURNS and insn.mnemonic not in STOPS:
+      if block.number + 1 < len(blocks):
+        successors.append(blocks[block.number + 1])
+    for successor in successors:
+      if successor not in block.successors:
+        block.successors.append(successor)
+        successor.predecessors.append(block)
+  return blocks
+
+# Blocks reachable from the entry, in reverse postorder
+def reverse_postorder(blocks):
+  if len(blocks) == 0:
+    return []
+  postorder = []
+  visited = [False] * len(blocks)
+  visited[0] = True
+  stack = [(blocks[0], iter(blocks[0].successors))]
+  while stack:
+    block, successors = stack[-1]
+    for successor in successors:
+      if not visited[successor.number]:
+        visited[successor.number] = True
+        stack.append((successor, iter(successor.successors)))
+        break
+    else:
+      stack.pop()
+      postorder.append(block)
+  postorder.reverse()
+  return postorder
+
+# Dominator tree of the function
+class Dominators(object):
+
+  def __init__(self, blocks):
+    self.order = reverse_postorder(blocks)
+    # position of each block in reverse postorder (-1 if unreachable)
+    self.rpo = [-1] * len(blocks)
+    for i, block in enumerate(self.order):
+      self.rpo[block.number] = i
+
+    # Immediate dominators, indexed by reverse postorder position
+    preds = [[self.rpo[p.number] for p in block.predecessors
+              if self.rpo[p.number] != -1] for block in self.order]
+    idom = [-1] * len(self.order)
+    if len(self.order) > 0:
+      idom[0] = 0
+    changed = True
+    while changed:
+      changed = False
+      for i in xrange(1, len(self.order)):
+        new_idom = -1
+        for p in preds[i]:
+          if idom[p] == -1:
+            continue
+          if new_idom == -1:
+            new_idom = p
+            continue
+          # intersect
+          a, b = p, new_idom
+          while a != b:
+            while a > b:
+              a = idom[a]
+            while b > a:
+              b = idom[b]
+          new_idom = a
+        if idom[i] != new_idom:
+          idom[i] = new_idom
+          changed = True
+    self.idom = idom
+
+    # Number the dominator tree so that dominance checks are O(1)
+    children = [[] for i in self.order]
+    for i in xrange(1, len(self.order)):
+      children[idom[i]].append(i)
+    self.pre = [0] * len(self.order)
+    self.post = [0] * len(self.order)
+    counter = 0
+    stack = [(0, False)] if len(self.order) > 0 else []
+    while stack:
+      i, done = stack.pop()
+      if done:
+        self.post[i] = counter
+      else:
+        self.pre[i] = counter
+        stack.append((i, True))
+        stack.extend((child, False) for child in children[i])
+      counter += 1
+
+  # Is the block reachable from the entry?
+  def reachable(self, block):
+    return self.rpo[block.number] != -1
+
+  # Does block a dominate block b?
+  def dominates(self, a, b):
+    a, b = self.rpo[a.number], self.rpo[b.number]
+    if a == -1 or b == -1:
+      return False
+    return self.pre[a] <= self.pre[b] and self.post[b] <= self.post[a]
+
+# A natural loop
+class NaturalLoop(object):
+
+  def __init__(self, header, latches, body):
+    self.number = 0
+    self.header = header    # block every iteration goes through
+    self.latches = latches  # blocks with a back-edge to the header
+    self.body = body        # numbers of the blocks in the loop
+    self.exits = []         # (block in the loop, block outside) edges
+    self.parent = None      # innermost loop containing this one
+    self.children = []
+    self.depth = 1
+
+# Natural loops of a function, as a nesting forest
+class LoopForest(object):
+
+  def __init__(self, function):
+    self.function = function
+    self.blocks = build_cfg(function)
+    self.dominators = Dominators(self.blocks)
+    dominators = self.dominators
+
+    # Back-edges, grouped by loop header
+    latches = {}
+    for block in dominators.order:
+      for successor in block.successors:
+        if dominators.dominates(successor, block):
+          latches.setdefault(successor.number, []).append(block)
+
+    # Loop bodies, outer loops first (a header comes after the headers
+    # of its enclosing loops in reverse postorder)
+    headers = sorted(latches, key=lambda n: dominators.rpo[n])
+    innermost = {}
+    self.loops = []
+    self.roots = []
+    for number in headers:
+      header = self.blocks[number]
+      body = set([number])
+      work = []
+      for latch in latches[number]:
+        if latch.number not in body:
+          body.add(latch.number)
+          work.append(latch)
+      while work:
+        block = work.pop()
+        for pred in block.predecessors:
+          if pred.number not in body and dominators.reachable(pred):
+            body.add(pred.number)
+            work.append(pred)
+      loop = NaturalLoop(header, latches[number], body)
+      for n in body:
+        for successor in self.blocks[n].successors:
+          if successor.number not in body:
+            loop.exits.append((self.blocks[n], successor))
+      # Nest it inside the innermost loop seen so far holding its header
+      loop.parent = innermost.get(number)
+      if loop.parent is None:
+        self.roots.append(loop)
+      else:
+        loop.parent.children.append(loop)
+        loop.depth = loop.parent.depth + 1
+      for n in body:
+        innermost[n] = loop
+      self.loops.append(loop)
+
+    # Number the loops in address order
+    self.loops.sort(key=lambda loop: loop.header.start)
+    for i, loop in enumerate(self.loops):
+      loop.number = i + 1
+    for loop in self.loops:
+      loop.children.sort(key=lambda child: child.number)
+    self.roots.sort(key=lambda root: root.number)
+
+  # Loops in the forest, each one followed by the loops nested in it
+  def preorder(self):
+    stack = list(reversed(self.roots))
+    while stack:
+      loop = stack.pop()
+      yield loop
+      stack.extend(reversed(loop.children))
+
+  # Address ranges covered by a loop: runs of contiguous blocks in the
+  # body, as (first instruction address, last instruction address)
+  def intervals(self, loop):
+    instructions = self.function.instructions
+    ranges = []
+    body = sorted(loop.body)
+    first = previous = body[0]
+    for n in body[1:] + [None]:
+      if n != previous + 1:
+        ranges.append((self.blocks[first].start,
+                       instructions[self.blocks[previous].last].addr))
+        first = n
+      previous = n
+    return ranges
+
+
+
+# ======= Loop Summaries =======
+# show loops --all sends the instructions of the program's functions to
+# worker processes as (address, length, text) tuples, in batches, and
+# gets a LoopSummary back for each function.
+
+# name, start : function
+# instructions : number of instructions of the function
+# loops : number of natural loops
+# depth : deepest loop nesting (0 without loops)
+# body : instructions inside at least one loop
+LoopSummary = namedtuple("LoopSummary",
+                         "name start instructions loops depth body")
+
+# Summary of the loops of a function
+def loop_summary(name, start, end, lines):
+  instructions = [make_instruction({"addr": addr, "length": length,
+                                    "asm": asm})
+                  for addr, length, asm in lines]
+  forest = LoopForest(Disassembly(name, start, end, instructions))
+  body = set()
+  for loop in forest.loops:
+    body.update(loop.body)
+  return LoopSummary(name, start, len(instructions), len(forest.loops),
+                     max([loop.depth for loop in forest.loops] or [0]),
+                     sum(forest.blocks[n].last - forest.blocks[n].first + 1
+                         for n in body))
+
+# Summaries of a batch of (name, start, end, lines) functions
+def loop_summaries(batch):
+  return [loop_summary(*function) for function in batch]
@@ -0,0 +1,652 @@
+#################################################
+# S-GDB : x86 instruction database              #
+#################################################
+
+# Imports
+from collections import OrderedDict
+from sgdblib.common import colors
+from sgdblib.output import Output
+
+
+
+# Instruction Database
+# The description of each x86 instruction is kept in the table below.
+# An entry starts with a line "@ <mnemonic> <aliases...>" followed by
+# the text printed by the instruction command. The table is only parsed
+# the first time an instruction is looked up.
+INSTRUCTIONS = """
+@ push
+Push Instruction
+----------------
+Usage: push <register>
+       push <value>
+
+Info: Pushes the value onto the stack.
+      Typically used to save the value of a register
+      to resue that register for other purpose.
+@ pop
+Pop Instruction
+---------------
+Usage: pop <register>
+
+Info: Saves the value at the top of the stack into the register.
+      Used to restore a value back right before returning to the
+      caller.
+@ mov
+Mov Instruction
+---------------
+Usage: mov <src>, <dst>
+       mov $0x0, %rdx
+
+Info: Places the value at src in dst. For example, the first
+      instruction puts the value 0x0 in the rdx register.
+@ call
+Call Instruction
+----------------
+Usage: call <address>
+
+Info: Calls the function pointed at by the address given.
+      It can be used for recursive calls or to call other
+      functions. Beware: this is not a jump. Once the
+      called function returns, the instruction after the call
+      gets executed next.
+@ ret
+Ret Instruction
+---------------
+Usage: ret
+
+Info: Returns back to the calling function.
+@ rep repnz repz
+Rep Instruction
+---------------
+Usage (1): rep <instruction>
+      (2): rep ret
+
+Info: (1): Repeat string operation until tested-condition.
+           (more info: aldeid.com/wiki/x86-assembly/Instructions/rep
+      (2): Used as a no-op if preceded by a conditional jump. This is
+           used to fix an AMD-compiler inconsistency.
+           More info: repzret.org/p/repzret
+@ nop
+Nop Instruction
+---------------
+Usage: nop
+
+Info: Spends a CPU cycle with no effect (no-operation).
+@ sub
+Sub Instruction
+---------------
+Usage: sub <src>, <dst>
+
+Info: <dst> = <dst> - <src>, subtracts <src> from <dst> and
+      stores the results in <dst>.
+      You may find sub being used with the registers rbp and
+      rsp. This typically means that some space is being
+      allocated in the stack (by pushing rsp down).
+@ add
+Add Instruction
+---------------
+Usage: add <src>, <dst>
+
+Info: <dst> = <dst> + <src>, adds <src> to <dst> and stores
+      the result in <dst>.
+@ lea
+Lea (load effective address) Instruction
+----------------------------------------
+Usage: lea <src>, <dst>
+       lea 3(%rax,%rax,4), %rdx
+
+Info: Assuming that rax=x, lea will store 5x+3 in rdx.
+@ sar
+Sar (Arithmetic Rigth Shift) Instruction
+---------------------------------------
+Usage: sar k, <dst>
+
+Info: Shifts the bits in <dst> by k to the right, filling
+      the left side with sign bits. Example:
+      sar 1, %rdx
+       assuming rdx=-2, then 1110 >> 1 = 1111 ---> rdx=-1
+@ sal
+Sal (Arithmentic Left Shift) Instruction
+----------------------------------------
+Usage: sal k, <dst>
+
+Info: Shifts the bits in <dst> by k to the left, filling
+      the right with 0s. Example:
+      sal 2, %rdx
+       assuming rdx=2, then 0010 >> 2 = 1000 ---> rdx=4
+@ shr
+Shr (Logical Right Shift) Instruction
+-------------------------------------
+Usage: shr k, <dst>
+
+Info: Shifts the bits in <dst> by k to the right, filling
+      the left with 0s. Example:
+      shr 1, %rdx
+       assuming rdx=-1, then 1111 >> 1 = 0111 ---> rdx=3
+@ shl
+Shl (Logical Left Shift) Instruction
+------------------------------------
+Usage: shl k, <dst>
+
+Info: Shifts the bits in <dst> by k to the left, filling
+      the right with 0s. Example:
+      shl 2, %rdx
+       assuming rdx=2, then 0010 >> 2 = 1000 ---> rdx=4
+@ or
+OR Instruction
+--------------
+Usage: or <src>, <dst>
+
+Info: <dst> = <dst> | <src>, performs a logical OR and
+      stores the result in <dst>.
+@ xor
+XOR Instruction
+---------------
+Usage: xor <src>, <dst>
+
+Info: <dst> = <dst> ^ <src>, performs an exclusive-OR
+      and stores the result in <dst>.
+@ and
+AND Instruction
+---------------
+Usage: and <src>, <dst>
+
+Info: <dst> = <dst> & <src>, performs a logical AND
+      and stores the result in <dst>.
+@ not
+Not Instruction
+---------------
+Usage: not <dst>
+
+Info: <dst> = ~<dst>, performs the complement of <dst>
+      and stores it in <dst>. Beware, this is not the
+      same as the ! operator!
+@ inc
+Inc Instruction
+---------------
+Usage: inc <dst>
+
+Info: <dst> = <dst> + 1, increments <dst> by 1.
+@ dec
+Dec Instruction
+---------------
+Usage: dec <dst>
+
+Info: <dst> = <dst> - 1, decrements <dst> by 1.
+@ neg
+Neg Instruction
+---------------
+Usage: neg <dst>
+
+Info: <dst> = (-1) * <dst>, negates <dst>.
+@ imul mul
+iMul/Mul Instruction
+----------------
+Usage: (1) imul <src>, <dst>
+       (2) imul <dst>
+           mul <dst>
+
+Info: (1) <dst> = <dst> * <src>, multiplies <dst>*<src> and stores
+      the value in <dst>.
+      (2) edx:eax = <dst> * eax, stores the results across edx and eax
+          (edx has top 32 bits, and eax the lower 32 bits).
+@ cqto cqo
+Not currently documented.
+@ idiv div
+iDiv/Div Instruction
+--------------------
+Usage: (1) idiv <arg>
+       (2) div k
+
+Info: (1) eax = edx:eax / <arg>, the quotient goes into eax and
+          the remainder goes into edx.
+      (2) eax = edx:eax / k, the quotient goes into eax and
+          the remainder goes into edx.
+@ cmp
+Cmp Instruction
+---------------
+Usage: cmp <a1>, <a2>
+
+Info: Performs the operation <a2> - <a1>, which sets the SF if
+      the result is negative (meaning <a2> < <a1>). This is used
+      for control flow and conditional jumps.
+@ test
+Test Instruction
+----------------
+Usage: test <a1>, <a2>
+
+Info: Performs the operation <a1> & <a2>, which sets the ZF if
+      the result is 0x0. This is typically used to test if a
+      value is 0. For example:
+       if rax = 0, then test %rax,%rax will set the ZF flag
+       if rax = 1, then test %rax,%rax won't set the ZF flag
+      This instruction is useful for control flow.
+@ sete setz
+Sete/Setz (Set when Equal) Instruction
+----------------
+Usage: sete <dst>
+       setz <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1 depending on the ZF condition code.
+      Useful for control flow after cmp or test instructions.
+@ setne setnz
+Setne (Set when Not Equal) Instruction
+--------------------------------------
+Usage: setne <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to ~ZF.
+      Useful for control flow after cmp or test instructions.
+@ sets
+Sets (Set when negative) Instruction
+----------------
+Usage: sets <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to SF.
+      Useful for control flow after cmp or test instructions.
+@ setns
+Setns (Set when nonnegative) Instruction
+-----------------
+Usage: setns <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to ~SF.
+      Useful for control flow after cmp or test instructions.
+@ setg setnle
+Setg (Set when greater) Instruction
+----------------
+Usage: setg <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to ~(SF ^ OF) & ZF.
+      Useful for control flow after cmp or test instructions.
+@ setge setnl
+Setge (Set when greater or equal) Instruction
+---------------------------------------------
+Usage: setge <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to ~(SF ^ OF).
+      Useful for control flow after cmp or test instructions.
+@ setl setnge
+Setl (Set when less) Instruction
+--------------------------------
+Usage: setl <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to (SF ^ OF).
+      Useful for control flow after cmp or test instructions.
+@ setle setng
+Setle (Set when less or equal) Instruction
+------------------------------------------
+Usage: setle <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to ~(SF ^ OF) | ZF.
+      Useful for control flow after cmp or test instructions.
+@ seta setnbe
+Seta (Set when above) Instruction
+---------------------------------
+Usage: seta <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to ~CF & ~ZF.
+      Useful for control flow after cmp or test instructions.
+      Equivalent to setg, but for unsigned numbers.
+@ setae setnb
+Setae (Set when above or equal) Instruction
+-------------------------------------------
+Usage: setae <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to ~CF.
+      Useful for control flow after cmp or test instructions.
+      Equivalent to setge, but for unsigned numbers.
+@ setb setnae
+Setb (Set when below) Instruction
+---------------------------------
+Usage: setb <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to CF.
+      Useful for control flow after cmp or test instructions.
+      Equivalent to setl, but for unsigned numbers.
+@ setbe setna
+Setbe (Set when below or equal) Instruction
+-------------------------------------------
+Usage: setbe <dst>
+
+Info: Typically <dst> will be either a memory address or a single byte
+      register (such as al). This instruction sets the first byte at
+      the <dst> memory address or the value of the single-byte register
+      to 0 or 1, acording to CF | ZF.
+      Useful for control flow after cmp or test instructions.
+      Equivalent to setle, but for unsigned numbers.
+@ jmp
+Jmp Instruction
+---------------
+Usage: (1) jmp <target>
+       (2) jmp *<target>
+
+Info: Jump to the target address unconditionally (an address of any
+      labeled instruction is a target).
+       (1) Direct jump: jump target is encoded as a label.
+       (2) Indirect Jump: jump target is read from memory or a register.
+@ je jz
+Je/Jz Instruction
+---------------
+Usage: je <target>
+       jz <target>
+
+Info: Jump to the target when ZF is set (an address of any
+      labeled instruction is a target).
+@ jne jnz
+Jne/Jnz Instruction
+---------------
+Usage: jne <target>
+       jnz <target>
+
+Info: Jump to the target when ~ZF is set (an address of any
+      labeled instruction is a target).
+@ js
+Js Instruction
+--------------
+Usage: js <target>
+
+Info: Jump to the target when SF is set (an address of any
+      labeled instruction is a target).
+@ jns
+Jns Instruction
+---------------
+Usage: jns <target>
+
+Info: Jump to the target when ~SF (an address of any
+      labeled instruction is a target).
+@ jg jnle
+Jg/Jnle Instruction
+-------------------
+Usage: jg <target>
+       jnle <target>
+
+Info: Jump to the target when ~(SF ^ OF) & ~ZF is set (an address of any
+      labeled instruction is a target).
+@ jge jnl
+Jge/Jnl Instruction
+-------------------
+Usage: jge <target>
+       jnl <target>
+
+Info: Jump to the target when ~(SF ^ OF) is set (an address of any
+      labeled instruction is a target).
+@ jl jnge
+Jl/Jnge Instruction
+-------------------
+Usage: jl <target>
+       jnge <target>
+
+Info: Jump to the target when SF ^ OF is set (an address of any
+      labeled instruction is a target).
+@ jle jng
+Jle/Jng Instruction
+-------------------
+Usage: jle <target>
+       jng <target>
+
+Info: Jump to the target when (SF ^ OF) | ZF is set (an address of any
+      labeled instruction is a target).
+@ ja jnbe
+Ja/Jnbe Instruction
+-------------------
+Usage: ja <target>
+       jnbe <target>
+
+Info: Jump to the target when ~CF & ~ZF is set (an address of any
+      labeled instruction is a target).
+@ jae jnb
+Jae/Jnb Instruction
+-------------------
+Usage: jae <target>
+       jnb <target>
+
+Info: Jump to the target when ~CF is set (an address of any
+      labeled instruction is a target).
+@ jb jnae
+Jb/Jnae Instruction
+-------------------
+Usage: jb <target>
+       jnae <target>
+
+Info: Jump to the target when CF is set (an address of any
+      labeled instruction is a target).
+@ jbe jna
+Jbe/Jna Instruction
+-------------------
+Usage: jbe <target>
+       jna <target>
+
+Info: Jump to the target when CF | ZF is set (an address of any
+      labeled instruction is a target).
+@ cmove cmovz
+Cmove/Cmovz (Conditional Mov when Equal) Instruction
+----------------------------------------------------
+Usage: cmove <src>, <dst>
+       cmovz <src>, <dst>
+
+Info: mov <src>, <dst> is executed if ZF is set.
+@ cmovne cmovnz
+Cmovne/Cmovnz (Conditional Mov when Not Equal) Instruction
+----------------------------------------------------------
+Usage: cmovne <src>, <dst>
+       cmovnz <src>, <dst>
+
+Info: mov <src>, <dst> is executed if ~ZF is set.
+@ cmovs
+Cmovs (Conditional Mov when Negative) Instruction
+-------------------------------------------------
+Usage: cmovs <src>, <dst>
+
+Info: mov <src>, <dst> is executed if SF is set.
+@ cmovns
+Cmovns (Conditional Mov when Positive) Instruction
+--------------------------------------------------
+Usage: cmovns <src>, <dst>
+
+Info: mov <src>, <dst> is executed if ~SF is set.
+@ cmovg cmovnle
+Cmovg/Cmovnle (Conditional Mov when Greater) Instruction
+--------------------------------------------------------
+Usage: cmovg <src>, <dst>
+       cmovnle <src>, <dst>
+
+Info: mov <src>, <dst> is executed if ~(SF ^ OF) & ~ZF is set.
+@ cmovge cmovnl
+Cmovge/Cmovnl (Conditional Mov when Greater or Equal) Instruction
+-----------------------------------------------------------------
+Usage: cmovge <src>, <dst>
+       cmovnl <src>, <dst>
+
+Info: mov <src>, <dst> is executed if ~(SF ^ OF) is set.
+@ cmovl cmovnge
+Cmovl/Cmovnge (Conditional Mov when Less) Instruction
+-----------------------------------------------------
+Usage: cmovl <src>, <dst>
+       cmovnge <src>, <dst>
+
+Info: mov <src>, <dst> is executed if SF ^ OF is set.
+@ cmovle cmovng
+Cmovle/Cmovng (Conditional Mov when Less or Equal) Instruction
+--------------------------------------------------------------
+Usage: cmovle <src>, <dst>
+       cmovng <src>, <dst>
+
+Info: mov <src>, <dst> is executed if (SF ^ OF) | ZF is set.
+@ cmova cmovnbe
+Cmova/Cmovnbe (Conditional Mov when Above) Instruction
+------------------------------------------------------
+Usage: cmova <src>, <dst>
+       cmovnbe <src>, <dst>
+
+Info: mov <src>, <dst> is executed if ~CF & ~ZF is set.
+@ cmovae cmovnb
+Cmovae/Cmovnb (Conditional Mov when Above or Equal) Instruction
+---------------------------------------------------------------
+Usage: cmovae <src>, <dst>
+       cmovnb <src>, <dst>
+
+Info: mov <src>, <dst> is executed if ~CF is set.
+@ cmovb cmovnae
+Cmovb/Cmovnae (Conditional Mov when Below) Instruction
+------------------------------------------------------
+Usage: cmovb <src>, <dst>
+       cmovnae <src>, <dst>
+
+Info: mov <src>, <dst> is executed if CF is set.
+@ cmovbe cmovna
+Cmovbe/Cmovna (Conditional Mov when Below or Equal) Instruction
+---------------------------------------------------------------
+Usage: cmovbe <src>, <dst>
+       cmovna <src>, <dst>
+
+Info: mov <src>, <dst> is executed if CF | ZF is set.
+@ clt
+Clt Instruction
+---------------
+Usage: clt
+
+Info: Sign extends eax to rax.
+@ leave
+Leave Instruction
+-----------------
+Usage: leave
+
+Info: Restores the caller's stack registers (rbp and rsp),
+      to prepare for the current function to end and return
+      execution to the caller.
+"""
+
+class InstructionDatabase(object):
+
+  def __init__(self, table):
+    self.table = table
+    self.entries = None  # mnemonic -> description
+
+  def load(self):
+    self.entries = {}
+    names = []
+    text = []
+    for line in self.table.strip("\n").split("\n") + ["@"]:
+      if line.startswith("@"):
+        for name in names:
+          self.entries[name] = "\n".join(text)
+        names = line[1:].split()
+        text = []
+      else:
+        text.append(line)
+
+  # Mnemonic as found in the table: lowercase, and without the size
+  # suffix GDB adds (movq -> mov, cltq -> clt). None if unknown.
+  def normalize(self, mnemonic):
+    if self.entries is None:
+      self.load()
+    mnemonic = mnemonic.strip().lower()
+    if mnemonic in self.entries:
+      return mnemonic
+    if mnemonic[-1:] in ("b", "w", "l", "q") and \
+        mnemonic[:-1] in self.entries:
+      return mnemonic[:-1]
+    return None
+
+  # Description of an instruction, None if unknown
+  def lookup(self, mnemonic):
+    name = self.normalize(mnemonic)
+    if name is None:
+      return None
+    return self.entries[name]
+
+instruction_db = InstructionDatabase(INSTRUCTIONS)
+
+# Printed for unknown instructions
+def print_unknown_instruction(out, instruction=""):
+  out.line(colors.red + "Invalid instruction " + instruction + ".")
+  out.line("Size suffixes are removed automatically (movq -> mov,")
+  out.line("cltq -> clt), so this instruction is not documented yet." +
+           colors.nc)
+
+
+
+# instruction command
+def instruction(arg, from_tty):
+  args = arg.split()
+  if len(args) > 0 and args[0] == "info":
+    args = args[1:]
+  if len(args) > 0 and args[0] == "--all-in":
+    explain_function(" ".join(args[1:]))
+    return
+  out = Output()
+  out.line(colors.bold)
+  if len(args) == 0:
+    print_unknown_instruction(out)
+  for instruction in args:
+    text = instruction_db.lookup(instruction)
+    if text is None:
+      print_unknown_instruction(out, instruction)
+    else:
+      out.line(text)
+      out.line()
+  out.line(colors.nc)
+  out.flush()
+
+# Explain every distinct instruction of a function, in the order they
+# first appear
+def explain_function(name):
+  from sgdblib.analysis import analysis_cache
+  function = analysis_cache.function(name)
+  used = OrderedDict()  # description -> mnemonics using it
+  counts = {}
+  unknown = []
+  for insn in function.instructions:
+    counts[insn.mnemonic] = counts.get(insn.mnemonic, 0) + 1
+    if counts[insn.mnemonic] > 1:
+      continue
+    text = instruction_db.lookup(insn.mnemonic)
+    if text is None:
+      unknown.append(insn.mnemonic)
+    else:
+      used.setdefault(text, []).append(insn.mnemonic)
+  out = Output()
+  out.line(colors.bold + "Instructions used by " + function.name + ":" + \
+      colors.nc)
+  for text, mnemonics in used.items():
+    out.line(colors.color_list[1] + ", ".join(
+        m + " (x" + str(counts[m]) + ")" for m in mnemonics) + colors.nc)
+    out.line(colors.bold + text + colors.nc)
+    out.line()
+  if len(unknown) > 0:
+    out.line(colors.red + "Not documented: " + ", ".join(unknown) +
+             colors.nc)
+  out.flush()
@@ -0,0 +1,726 @@
+#################################################
+# S-GDB : memory examination                    #
+#################################################
+
+# Imports
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import hashlib
+import mmap
+import re
+import struct
+import time
+from sgdblib.common import colors
+from sgdblib.output import Output, write
+
+
+
+# ======= Local Formatting =======
+# Instead of running x/ and letting GDB parse and print every value,
+# the region is read with a single read_memory() call, converted with a
+# single struct.unpack_from() call, and formatted here. The values can
+# also be used directly through read_values().
+
+# Size in bytes and values per line (same as x/) of each grouping
+GROUPS = {"b": (1, 8), "h": (2, 8), "w": (4, 4), "g": (8, 2)}
+GROUP_SIZES = {"1": "b", "2": "h", "4": "w", "8": "g"}
+# struct codes for (signed, unsigned) values of each size
+CODES = {1: ("b", "B"), 2: ("h", "H"), 4: ("i", "I"), 8: ("q", "Q")}
+FORMATS = "todux"
+
+# "<" or ">" depending on the byte order of the program
+def byte_order():
+  if "big endian" in gdb.execute("show endian", to_string=True):
+    return ">"
+  return "<"
+
+# Evaluate an address expression such as $rbp-0x186d0
+def parse_address(expression):
+  return int(gdb.parse_and_eval(expression)) & 0xffffffffffffffff
+
+# Read the bytes of a region of the program's memory (see DirectReader)
+def read_bytes(address, length):
+  data = direct_reader.read(address, length)
+  if data is None:
+    return gdb.selected_inferior().read_memory(address, length)
+  return data
+
+# Copy of a buffer returned by read_bytes as a byte string
+def to_bytes(data):
+  if hasattr(data, "tobytes"):
+    return data.tobytes()
+  return bytes(data)
+
+# Values stored at address, num_bytes long, as groups of 1, 2, 4 or 8
+# bytes (b, h, w, g). Signed values for the d format, unsigned otherwise.
+def read_values(address, num_bytes, print_format="x", group="b"):
+  size = GROUPS[group][0]
+  count = (num_bytes + size - 1) // size
+  data = read_bytes(address, count * size)
+  code = CODES[size][0 if print_format == "d" else 1]
+  return struct.unpack_from(byte_order() + str(count) + code, data)
+
+# Text of one value, like x/ prints it
+def value_formatter(print_format, size):
+  if print_format == "o":
+    return lambda value: "0%o" % value if value else "0"
+  if print_format == "t":
+    return lambda value: format(value, "0%db" % (8 * size))
+  return None
+
+# printf-style format of one value, for the formats that have one
+ITEM_FORMATS = {"d": "%d", "u": "%d"}
+
+# Lines of text for the values read at address
+def format_values(address, values, print_format="x", group="b"):
+  size, per_line = GROUPS[group]
+  formatter = value_formatter(print_format, size)
+  values = tuple(values)
+  lines = []
+  if formatter is None:
+    # Format a whole line at once
+    item = ITEM_FORMATS.get(print_format, "0x%%0%dx" % (2 * size))
+    line = "0x%x:\t" + "\t".join([item] * per_line)
+    full = len(values) - len(values) % per_line
+    for i in xrange(0, full, per_line):
+      lines.append(line % ((address + i * size,) + values[i:i + per_line]))
+    if full < len(values):
+      rest = len(values) - full
+      line = "0x%x:\t" + "\t".join([item] * rest)
+      lines.append(line % ((address + full * size,) + values[full:]))
+    return lines
+  for i in xrange(0, len(values), per_line):
+    lines.append("0x%x:\t" % (address + i * size) +
+                 "\t".join(map(formatter, values[i:i + per_line])))
+  return lines
+
+# Arguments of the non-interactive forms of the memory command:
+#   memory addr=<address> num_bytes=<n> format=<t,o,d,u,x,s> grouped_by=<1,2,4,8>
+#   memory <address> <number of bytes> <format> <group>
+# Returns (address expression, number of bytes, format, group)
+def parse_arguments(arg):
+  words = arg.split()
+  options = {}
+  positional = []
+  for word in words:
+    if "=" in word:
+      key, value = word.split("=", 1)
+      options[key] = value
+    else:
+      positional.append(word)
+  names = ["addr", "num_bytes", "format", "grouped_by"]
+  for name, value in zip(names, positional):
+    options.setdefault(name, value)
+  if "addr" not in options:
+    raise gdb.GdbError("Usage: memory <address> <number of bytes> "
+                       "<format> <group>")
+  print_format = options.get("format", "x")
+  if print_format not in FORMATS + "s":
+    raise gdb.GdbError("Invalid format %s (use t, o, d, u, x or s)" %
+                       print_format)
+  group = options.get("grouped_by", "b")
+  group = GROUP_SIZES.get(group, group)
+  if group not in GROUPS:
+    raise gdb.GdbError("Invalid group %s (use b, h, w, g or 1, 2, 4, 8)" %
+                       group)
+  num_bytes = options.get("num_bytes", "16")
+  try:
+    num_bytes = int(num_bytes, 0)
+  except ValueError:
+    raise gdb.GdbError("Number of bytes must be a number, not %s" %
+                       num_bytes)
+  return options["addr"], num_bytes, print_format, group
+
+
+
+# ======= Streaming Hexdump =======
+# Large regions are dumped chunk by chunk: each chunk is read, rendered
+# like "hexdump -C" and written to GDB's pager before the next one is
+# read, so memory use does not depend on the size of the region and the
+# output already shown is kept when the dump is interrupted (Ctrl-C, or
+# q at the pager prompt). Repeated identical lines are collapsed into a
+# single "*" line.
+
+# Bytes shown on each line
+HEXDUMP_WIDTH = 16
+# Default number of bytes read at once
+CHUNK_SIZE = 1 << 20
+
+# Printable characters, everything else shows as .
+ASCII_TABLE = "".join(chr(c) if 32 <= c < 127 else "." for c in xrange(256))
+
+# (address, bytes) pieces of [address, address + length)
+def read_chunks(address, length, chunk=CHUNK_SIZE):
+  end = address + length
+  while address < end:
+    size = min(chunk, end - address)
+    yield address, to_bytes(read_bytes(address, size))
+    address += size
+
+# One full hexdump line
+HEXDUMP_LINE = "%016x  " + " ".join(["%02x"] * (HEXDUMP_WIDTH // 2)) + \
+    "  " + " ".join(["%02x"] * (HEXDUMP_WIDTH // 2)) + "  |%s|"
+
+# One hexdump line
+def hexdump_line(address, data):
+  if len(data) == HEXDUMP_WIDTH:
+    return HEXDUMP_LINE % ((address,) + tuple(bytearray(data)) +
+                           (data.translate(ASCII_TABLE),))
+  hex_bytes = ["%02x" % value for value in bytearray(data)]
+  hex_bytes += ["  "] * (HEXDUMP_WIDTH - len(hex_bytes))
+  half = HEXDUMP_WIDTH // 2
+  return "%016x  %s  %s  |%s|" % (address, " ".join(hex_bytes[:half]),
+                                   " ".join(hex_bytes[half:]),
+                                   data.translate(ASCII_TABLE))
+
+# Hexdump text of each chunk of [address, address + length)
+def hexdump(address, length, chunk=CHUNK_SIZE):
+  chunk -= chunk % HEXDUMP_WIDTH
+  previous = None
+  collapsed = False
+  for start, data in read_chunks(address, length, max(chunk, HEXDUMP_WIDTH)):
+    lines = []
+    for i in xrange(0, len(data), HEXDUMP_WIDTH):
+      line = data[i:i + HEXDUMP_WIDTH]
+      if line == previous and len(line) == HEXDUMP_WIDTH:
+        if not collapsed:
+          lines.append("*")
+          collapsed = True
+        continue
+      previous = line
+      collapsed = False
+      lines.append(hexdump_line(start + i, line))
+    yield start + len(data), lines
+
+# memory dump command
+def dump(arg):
+  words = arg.split()
+  if len(words) < 2:
+    raise gdb.GdbError("Usage: memory dump <address> <number of bytes> "
+                       "[chunk size]")
+  address = parse_address(words[0])
+  length = int(gdb.parse_and_eval(words[1]))
+  chunk = int(words[2], 0) if len(words) > 2 else CHUNK_SIZE
+  shown = address
+  try:
+    for shown, lines in hexdump(address, length, chunk):
+      if lines:
+        write("\n".join(lines) + "\n")
+    write("%016x\n" % (address + length))
+  except KeyboardInterrupt:
+    write("\n" + colors.yellow + "Dump interrupted after %d bytes." %
+          (shown - address) + colors.nc + "\n")
+  except gdb.MemoryError as error:
+    write(colors.red + str(error) + colors.nc + "\n")
+
+
+
+# ======= Direct Reads =======
+# GDB reads the memory of a local program through ptrace, a few bytes at
+# a time. When the program runs on this machine, large regions are read
+# from /proc/<pid>/mem instead: the file is opened once per stop and read
+# into a buffer that is kept between reads. Remote programs, core files
+# and reads that fail (unmapped pages) use read_memory() as before.
+# "sgdb fastmem off" turns this off, "sgdb fastmem bench" compares both.
+
+# Smaller reads always go through GDB
+DIRECT_MIN = 4096
+
+class DirectReader(object):
+  def __init__(self):
+    self.enabled = True
+    self.pid = None
+    self.file = None
+    self.buffer = bytearray(0)
+    self.direct_bytes = 0
+    self.gdb_bytes = 0
+
+  # True when GDB runs the program itself, on this machine
+  def native(self):
+    connection = getattr(gdb.selected_inferior(), "connection", None)
+    if connection is not None:
+      return connection.type == "native"
+    return "child process" in gdb.execute("info target", to_string=True)
+
+  # /proc/<pid>/mem of the program, or None when it cannot be used
+  def open(self):
+    pid = gdb.selected_inferior().pid
+    if pid != self.pid:
+      self.close()
+      self.pid = pid
+      if pid != 0 and self.native():
+        try:
+          self.file = open("/proc/%d/mem" % pid, "rb", 0)
+        except (IOError, OSError):
+          self.file = None
+    return self.file
+
+  # Forget the file when the program runs again or exits
+  def close(self, event=None):
+    if self.file is not None:
+      self.file.close()
+    self.file = None
+    self.pid = None
+
+  # Contents of [address, address + length) or None if they have to be
+  # read through GDB. The buffer returned is reused by the next read.
+  def read(self, address, length):
+    data = None
+    if self.enabled and length >= DIRECT_MIN:
+      data = self.read_file(address, length)
+    if data is None:
+      self.gdb_bytes += length
+    else:
+      self.direct_bytes += length
+    return data
+
+  # Contents of [address, address + length) read from /proc/<pid>/mem
+  def read_file(self, address, length):
+    mem = self.open()
+    if mem is None:
+      return None
+    if len(self.buffer) < length:
+      self.buffer = bytearray(length)
+    view = memoryview(self.buffer)[:length]
+    done = 0
+    try:
+      mem.seek(address)
+      while done < length:
+        count = mem.readinto(view[done:])
+        if not count:
+          break
+        done += count
+    except (IOError, OSError, OverflowError):
+      done = 0
+    if done < length:
+      return None
+    return view
+
+direct_reader = DirectReader()
+
+# Bytes per second of a read function over [address, address + length)
+def throughput(read, address, length, chunk=CHUNK_SIZE):
+  started = time.time()
+  for start in xrange(address, address + length, chunk):
+    read(start, min(chunk, address + length - start))
+  return length / max(time.time() - started, 1e-9)
+
+# sgdb fastmem command
+def fastmem(arg, from_tty):
+  words = arg.split()
+  if len(words) > 0 and words[0] in ("on", "off"):
+    direct_reader.enabled = words[0] == "on"
+  elif len(words) > 0 and words[0] == "bench":
+    if len(words) != 3:
+      raise gdb.GdbError("Usage: sgdb fastmem bench <address> "
+                         "<number of bytes>")
+    address = parse_address(words[1])
+    length = int(gdb.parse_and_eval(words[2]))
+    if direct_reader.read_file(address, min(length, CHUNK_SIZE)) is None:
+      raise gdb.GdbError("0x%x cannot be read from /proc/<pid>/mem." %
+                         address)
+    inferior = gdb.selected_inferior()
+    rates = [("read_memory", throughput(inferior.read_memory,
+                                        address, length)),
+             ("/proc/%d/mem" % direct_reader.pid,
+              throughput(direct_reader.read_file, address, length))]
+    out = Output()
+    for name, rate in rates:
+      out.line("  %-20s %10.1f MB/s" % (name, rate / (1 << 20)))
+    out.line("  %-20s %10.1fx" % ("speedup", rates[1][1] / rates[0][1]))
+    out.flush()
+    return
+  elif len(words) > 0:
+    raise gdb.GdbError("Usage: sgdb fastmem [on|off|bench <address> "
+                       "<number of bytes>]")
+  out = Output()
+  if not direct_reader.enabled:
+    out.line("Direct reads: off")
+  elif direct_reader.open() is None:
+    out.line("Direct reads: on (not available for this program)")
+  else:
+    out.line("Direct reads: on (/proc/%d/mem)" % direct_reader.pid)
+  out.line("  %-20s %d" % ("bytes read directly", direct_reader.direct_bytes))
+  out.line("  %-20s %d" % ("bytes read by GDB", direct_reader.gdb_bytes))
+  out.flush()
+
+
+
+# ======= Snapshots =======
+# A snapshot keeps a copy of a region together with a digest of each
+# BLOCK_SIZE block. Comparing it with the program's memory only hashes
+# the current contents; the bytes of a block are compared one by one
+# only when its digest changed, and adjacent changed bytes are reported
+# as a single range. Snapshots saved to a file are mapped back with mmap,
+# so loading one does not read the copy until a block has to be compared.
+
+# Bytes covered by each digest
+BLOCK_SIZE = 4096
+# Saved snapshot: magic, address, length, block size, followed by the
+# digests and the copy of the region
+SNAPSHOT_MAGIC = "SGDBSNP1"
+SNAPSHOT_HEADER = struct.Struct("<8sQQQ")
+DIGEST_SIZE = hashlib.sha1().digest_size
+
+# Digest of each block_size block of data
+def block_digests(data, block_size=BLOCK_SIZE):
+  return [hashlib.sha1(data[i:i + block_size]).digest()
+          for i in xrange(0, len(data), block_size)]
+
+class Snapshot(object):
+  def __init__(self, name, address, data, digests=None, offset=0,
+               length=None, block_size=BLOCK_SIZE):
+    self.name = name
+    self.address = address
+    self.data = data
+    self.offset = offset
+    self.length = len(data) if length is None else length
+    self.block_size = block_size
+    self.digests = digests or block_digests(data, block_size)
+
+  # Bytes [start, end) of the region, relative to its address
+  def bytes(self, start, end):
+    return self.data[self.offset + start:self.offset + end]
+
+  def save(self, path):
+    with open(path, "wb") as output:
+      output.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.address,
+                                        self.length, self.block_size))
+      output.write("".join(self.digests))
+      for start in xrange(0, self.length, CHUNK_SIZE):
+        output.write(self.bytes(start, min(start + CHUNK_SIZE, self.length)))
+
+  @classmethod
+  def load(cls, name, path):
+    try:
+      with open(path, "rb") as source:
+        data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, OSError) as error:
+      raise gdb.GdbError("Cannot read %s: %s." % (path, error.strerror))
+    except ValueError:
+      # mmap cannot map an empty file
+      raise gdb.GdbError("%s is not an S-GDB snapshot." % path)
+    if len(data) < SNAPSHOT_HEADER.size:
+      raise gdb.GdbError("%s is not an S-GDB snapshot." % path)
+    magic, address, length, block_size = \
+        SNAPSHOT_HEADER.unpack_from(data, 0)
+    count = (length + block_size - 1) // block_size
+    offset = SNAPSHOT_HEADER.size + count * DIGEST_SIZE
+    if magic != SNAPSHOT_MAGIC or len(data) != offset + length:
+      raise gdb.GdbError("%s is not an S-GDB snapshot." % path)
+    digests = [data[SNAPSHOT_HEADER.size + i * DIGEST_SIZE:
+                    SNAPSHOT_HEADER.size + (i + 1) * DIGEST_SIZE]
+               for i in xrange(count)]
+    return cls(name, address, data, digests, offset, length, block_size)
+
+  # (start, end, blocks compared) of the ranges of bytes that differ
+  # between the snapshot and the program's memory, relative to address
+  def changes(self):
+    ranges = []
+    compared = 0
+    chunk = max(CHUNK_SIZE - CHUNK_SIZE % self.block_size, self.block_size)
+    for start, current in read_chunks(self.address, self.length, chunk):
+      base = start - self.address
+      for i in xrange(0, len(current), self.block_size):
+        block = current[i:i + self.block_size]
+        offset = base + i
+        if (hashlib.sha1(block).digest() ==
+            self.digests[offset // self.block_size]):
+          continue
+        compared += 1
+        old = bytearray(self.bytes(offset, offset + len(block)))
+        new = bytearray(block)
+        for j in xrange(len(new)):
+          if old[j] == new[j]:
+            continue
+          if ranges and ranges[-1][1] == offset + j:
+            ranges[-1][1] += 1
+          else:
+            ranges.append([offset + j, offset + j + 1])
+    return ranges, compared
+
+# Snapshots taken in this session, by name
+snapshots = {}
+
+# Hex bytes of a short range
+def hex_bytes(data):
+  return " ".join("%02x" % value for value in bytearray(data))
+
+# memory snapshot command
+def snapshot(arg):
+  words = arg.split()
+  if len(words) == 0:
+    out = Output()
+    if not snapshots:
+      out.line("No snapshots.")
+    for name in sorted(snapshots):
+      item = snapshots[name]
+      out.line("%-16s 0x%x, %d bytes" % (name, item.address, item.length))
+    out.flush()
+    return
+  if words[0] in ("save", "load"):
+    if len(words) != 3:
+      raise gdb.GdbError("Usage: memory snapshot %s <name> <file>" % words[0])
+    name, path = words[1], words[2]
+    if words[0] == "load":
+      snapshots[name] = Snapshot.load(name, path)
+    elif name not in snapshots:
+      raise gdb.GdbError("No snapshot named %s." % name)
+    else:
+      snapshots[name].save(path)
+    return
+  if len(words) != 3:
+    raise gdb.GdbError("Usage: memory snapshot <name> <address> "
+                       "<number of bytes>")
+  address = parse_address(words[1])
+  length = int(gdb.parse_and_eval(words[2]))
+  data = "".join(data for _, data in read_chunks(address, length))
+  snapshots[words[0]] = Snapshot(words[0], address, data)
+  write("Snapshot %s: 0x%x, %d bytes\n" % (words[0], address, length))
+
+# memory diff command
+def diff(arg):
+  words = arg.split()
+  if len(words) != 1:
+    raise gdb.GdbError("Usage: memory diff <name>")
+  if words[0] not in snapshots:
+    raise gdb.GdbError("No snapshot named %s." % words[0])
+  item = snapshots[words[0]]
+  ranges, compared = item.changes()
+  blocks = (item.length + item.block_size - 1) // item.block_size
+  out = Output()
+  for start, end in ranges:
+    line = "0x%x - 0x%x  %d bytes" % (item.address + start,
+                                      item.address + end, end - start)
+    if end - start <= HEXDUMP_WIDTH:
+      line += "  " + colors.red + hex_bytes(item.bytes(start, end)) + \
+          colors.nc + " -> " + colors.green + \
+          hex_bytes(read_bytes(item.address + start, end - start)) + colors.nc
+    out.line(line)
+  changed = sum(end - start for start, end in ranges)
+  out.line(colors.bold + "%d bytes changed in %d ranges (%d of %d blocks "
+           "compared)" % (changed, len(ranges), compared, blocks) + colors.nc)
+  out.flush()
+
+
+
+# ======= Pattern Search =======
+# memory find scans every readable mapping of the program: each mapping
+# is read in FIND_CHUNK pieces with one read_memory() call, and searched
+# with str.find or a compiled regular expression. Consecutive pieces
+# overlap so that matches crossing a piece boundary are found once.
+
+# Bytes read at once
+FIND_CHUNK = 4 << 20
+# Longest match found by regular expressions
+REGEX_OVERLAP = 4096
+# Matches written at once
+FIND_LINES = 1000
+
+# (start, end, label) of the readable mappings, from /proc/<pid>/maps
+# when the program runs on this machine, otherwise from GDB (the pid of
+# a remote program is not the one of a local process)
+def mappings():
+  pid = gdb.selected_inferior().pid
+  if pid == 0:
+    raise gdb.GdbError("The program is not being run.")
+  regions = []
+  if direct_reader.native():
+    try:
+      with open("/proc/%d/maps" % pid) as maps:
+        for line in maps:
+          fields = line.split(None, 5)
+          if len(fields) < 5 or "r" not in fields[1]:
+            continue
+          start, end = fields[0].split("-")
+          label = fields[5].strip() if len(fields) > 5 else ""
+          regions.append((int(start, 16), int(end, 16), label))
+      return regions
+    except IOError:
+      regions = []
+  output = gdb.execute("info proc mappings", to_string=True)
+  for line in output.splitlines():
+    fields = line.split()
+    if len(fields) < 4 or not fields[0].startswith("0x"):
+      continue
+    if len(fields) > 4 and fields[4][:1] in "r-" and len(fields[4]) == 4:
+      if "r" not in fields[4]:
+        continue
+      fields = fields[:4] + fields[5:]
+    label = " ".join(fields[4:])
+    regions.append((int(fields[0], 16), int(fields[1], 16), label))
+  return regions
+
+# Pattern search function for the arguments of memory find:
+#   -x <hex bytes>  bytes, such as -x 75 73 65 72 or -x 75736572
+#   -r <regex>      regular expression
+#   "<string>"      string, with C escapes such as \n or \x00
+# Returns (function(data) -> [(offset, length)], longest match)
+def parse_pattern(arg):
+  arg = arg.strip()
+  if arg.startswith("-r "):
+    try:
+      regex = re.compile(arg[3:].strip(), re.DOTALL)
+    except re.error as error:
+      raise gdb.GdbError("Invalid regular expression: %s" % error)
+    return (lambda data: [(match.start(), match.end() - match.start())
+                          for match in regex.finditer(data)], REGEX_OVERLAP)
+  if arg.startswith("-x "):
+    digits = "".join(arg[3:].split()).replace("0x", "")
+    try:
+      pattern = digits.decode("hex")
+    except TypeError:
+      raise gdb.GdbError("Invalid hex bytes: %s" % arg[3:].strip())
+  elif len(arg) > 1 and arg[0] == arg[-1] and arg[0] in "\"'":
+    pattern = arg[1:-1].decode("string_escape")
+  else:
+    pattern = arg
+  if len(pattern) == 0:
+    raise gdb.GdbError("Usage: memory find <\"string\"|-x hex bytes|-r regex>")
+  def find_all(data):
+    hits = []
+    position = data.find(pattern)
+    while position >= 0:
+      hits.append((position, len(pattern)))
+      position = data.find(pattern, position + 1)
+    return hits
+  return find_all, len(pattern)
+
+# (address, length, label) of the matches in the regions
+def search(regions, find_all, longest, chunk=FIND_CHUNK):
+  overlap = max(longest - 1, 0)
+  step = max(chunk - overlap, 1)
+  for start, end, label in regions:
+    address = start
+    while address < end:
+      size = min(step + overlap, end - address)
+      try:
+        data = to_bytes(read_bytes(address, size))
+      except gdb.MemoryError:
+        address += step
+        continue
+      # Matches starting in the overlap are found with the next piece
+      limit = step if address + size < end else size
+      for offset, length in find_all(data):
+        if offset < limit:
+          yield address + offset, length, label
+      address += step
+
+# memory find command
+def find(arg):
+  find_all, longest = parse_pattern(arg)
+  regions = mappings()
+  started = time.time()
+  hits = 0
+  out = Output()
+  try:
+    for address, length, label in search(regions, find_all, longest):
+      hits += 1
+      out.line("0x%016x  %-4d %s" % (address, length, label))
+      # Matches are shown while the search goes on
+      if len(out.lines) >= FIND_LINES:
+        out.flush()
+  except KeyboardInterrupt:
+    out.line(colors.yellow + "Search interrupted." + colors.nc)
+  scanned = sum(end - start for start, end, _ in regions)
+  out.line(colors.bold + "%d matches in %d mappings (%d bytes) in %.2fs" %
+           (hits, len(regions), scanned, time.time() - started) + colors.nc)
+  out.flush()
+
+
+
+# memory command
+def memory(arg, from_tty):
+  words = arg.split(None, 1)
+  if len(words) > 0 and words[0] == "dump":
+    dump(words[1] if len(words) > 1 else "")
+    return
+  if len(words) > 0 and words[0] == "snapshot":
+    snapshot(words[1] if len(words) > 1 else "")
+    return
+  if len(words) > 0 and words[0] == "find":
+    find(words[1] if len(words) > 1 else "")
+    return
+  if len(words) > 0 and words[0] == "diff":
+    diff(words[1] if len(words) > 1 else "")
+    return
+
+  # Address, size, format and grouping given as arguments
+  if len(arg) > 0:
+    expression, num_bytes, print_format, group = parse_arguments(arg)
+    if print_format == "s":
+      gdb.execute("x/s " + expression)
+      return
+    address = parse_address(expression)
+    values = read_values(address, num_bytes, print_format, group)
+    write("\n".join(format_values(address, values, print_format, group)) +
+          "\n")
+    return
+
+  # Beginners
+  if len(arg) == 0:
+    out = Output()
+    # Get the address
+    out.line(colors.bold)
+    out.flush()
+    address = raw_input("* What is the starting address? ")
+    out.line(colors.nc)
+    # Get the format
+    out.line(colors.bold)
+    out.line("Available Formats (to display binary, for example, enter b):")
+    out.line(colors.nc)
+    out.line("  t : binary - 0110 0001")
+    out.line("  o : octal  - 75")
+    out.line("  d : signed decimal - 97")
+    out.line("  u : unsigned decimal - 97")
+    out.line("  x : hexadecimal - 0x61")
+    out.line("  s : string - a")
+    out.line(colors.bold)
+    out.flush()
+    print_format = raw_input("* What format do you want? ")
+    out.line(colors.nc)
+    #if ((print_format != 't') && (print_format != 'o') && (print_format != 'd') && (print_format != 'u') && (print_format != 'x') && (print_format != 's')):
+    # print "Invalid format %s" % print_format
+    # return
+
+    # String/Bytes
+    if (print_format == 's'):
+      # Execute the examine GDB command
+      command = "x/s " + address
+      out.line("Executing GDB command... %s" % command)
+      out.line(colors.bold + colors.green)
+      out.flush()
+      gdb.execute(command)
+      out.line(colors.nc)
+    else:
+      # Get the number of bytes
+      out.line(colors.bold)
+      out.flush()
+      num_bytes = raw_input("* How many bytes do you want to display? ")
+      out.line(colors.nc)
+      if int(num_bytes) == 0:
+        out.line("Number of bytes must be a number, not %s" % num_bytes)
+        out.flush()
+        return
+      # Get the grouping
+      out.line(colors.bold)
+      out.line("Available Groupings (examples show in hexadcimal):")
+      out.line(colors.nc)
+      out.line("  b : 0xDE 0xAD 0xBE 0xEF 0xDE 0xAD 0xC0 0xDE")
+      out.line("  h : 0xDEAD 0xBEEF 0xDEAD 0xCODE")
+      out.line("  w : OxDEADBEEF 0xDEADCODE")
+      out.line("  g : 0xDEADBEEFDEADCODE")
+      out.line(colors.bold)
+      out.flush()
+      groups = raw_input("* What grouping do you want? ")
+      out.line(colors.nc)
+      #if (groups != 'b' && groups != 'h' && groups != 'w' && groups != 'g'):
+      # print "Invalid group %s\n" % groups
+      # return
+      # Execute the examine GDB command
+      command = "x/" + num_bytes + groups + print_format + " " + address
+      out.line("Executing GDB command... %s" % command)
+      out.line(colors.nc)
+      out.flush()
+      gdb.execute(command)
+      out.line(colors.nc)
+    out.flush()
@@ -0,0 +1,108 @@
+#################################################
+# S-GDB : buffered output                       #
+#################################################
+
+# Imports
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import re
+from sgdblib.common import colors
+
+
+
+# ======= Output =======
+# The lines printed by a command are collected in an Output and written
+# with a single gdb.write() call, which goes through GDB's pager, instead
+# of one write per print statement. Interactive commands call flush()
+# before asking for input or running a GDB command that prints, so the
+# text keeps its order. Colors are turned off with "sgdb color off"
+# (see colors.enable), in which case no ANSI sequence is produced.
+
+# ANSI color sequences, kept by split()
+ANSI_SEQUENCES = re.compile("(\033\\[[0-9;]*m)")
+
+# Characters per line of the terminal, None if unlimited
+def terminal_width():
+  try:
+    width = gdb.parameter("width")
+  except (gdb.error, RuntimeError):
+    return None
+  if not width or width < 0:
+    return None
+  return int(width)
+
+# True when GDB stops at each screen of output
+def paginated():
+  try:
+    return bool(gdb.parameter("pagination")) and bool(gdb.parameter("height"))
+  except (gdb.error, RuntimeError):
+    return False
+
+# Pieces of line, each at most width columns wide. Colors take no room
+# and tabs move to the next multiple of 8, as on the terminal, so the
+# pager counts the screen lines of colored lines correctly.
+def wrap(line, width):
+  if len(ANSI_SEQUENCES.sub("", line).expandtabs()) <= width:
+    return [line]
+  pieces = []
+  piece = []
+  column = 0
+  for i, part in enumerate(ANSI_SEQUENCES.split(line)):
+    if i % 2 == 1:
+      piece.append(part)
+      continue
+    for char in part:
+      step = 8 - column % 8 if char == "\t" else 1
+      if column + step > width:
+        pieces.append("".join(piece))
+        piece = []
+        column = 0
+        step = 8 if char == "\t" else 1
+      piece.append(char)
+      column += step
+  pieces.append("".join(piece))
+  return pieces
+
+# Write text to GDB at once
+def write(text):
+  if not text:
+    return
+  width = terminal_width()
+  if width is not None and paginated():
+    lines = []
+    for line in text.split("\n"):
+      lines.extend(wrap(line, width))
+    text = "\n".join(lines)
+  gdb.write(text)
+  gdb.flush()
+
+# Lines waiting to be written
+class Output(object):
+
+  def __init__(self):
+    self.lines = []
+
+  # Add a line, like print does
+  def line(self, text=""):
+    self.lines.append(text)
+
+  # Add several lines
+  def extend(self, lines):
+    self.lines.extend(lines)
+
+  # Write the lines added so far
+  def flush(self):
+    if self.lines:
+      self.lines.append("")
+      write("\n".join(self.lines))
+      self.lines = []
+
+
+
+# sgdb color command
+def color(arg, from_tty):
+  words = arg.split()
+  if len(words) == 1 and words[0] in ("on", "off"):
+    colors.enable(words[0] == "on")
+  elif len(words) > 0:
+    raise gdb.GdbError("Usage: sgdb color [on|off]")
+  write("Colors: %s\n" % ("on" if colors.enabled else "off"))
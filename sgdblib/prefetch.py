@@ -0,0 +1,154 @@
+#################################################
+# S-GDB : pre-analysis after each stop          #
+#################################################
+
+# Imports
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import threading
+import time
+from sgdblib.common import colors
+from sgdblib.output import write
+
+
+
+# ======= Pre-Analysis =======
+# When the program stops, the next command is often show loops or show
+# recursion on the current function. The function and the functions it
+# calls are decoded and analyzed in the background, so the results are
+# in the analysis cache when the command is typed.
+#
+# The work is a generator of small steps (decoding DECODE_SLICE
+# instructions, one analysis, one rendering). gdb.post_event runs them
+# in GDB's thread for SLICE seconds at a time, and a timer posts the
+# next slice PAUSE seconds later, which lets GDB read the keyboard in
+# between. Each stop or continue starts a new generation, and slices of
+# an older one do nothing. "sgdb prefetch off" turns it off.
+
+SLICE = 0.005
+PAUSE = 0.005
+DECODE_SLICE = 256
+# Functions called by the current one that are analyzed too
+MAX_CALLEES = 8
+
+class PreAnalysis(object):
+  def __init__(self):
+    self.enabled = True
+    self.generation = 0
+    self.functions = 0       # functions analyzed in the background
+    self.slices = 0
+    self.longest = 0.0       # seconds of the longest slice
+    self.cancelled = 0
+
+  # gdb.events.stop: analyze the function the program stopped in
+  def on_stop(self, event):
+    self.generation += 1
+    if self.enabled:
+      self.schedule(self.generation, self.steps())
+
+  # gdb.events.cont and exited: the work of the last stop is not needed
+  def cancel(self, event=None):
+    self.generation += 1
+
+  # Run the next slice of steps after a pause
+  def schedule(self, generation, steps):
+    timer = threading.Timer(PAUSE, gdb.post_event,
+                            [lambda: self.run(generation, steps)])
+    timer.daemon = True
+    timer.start()
+
+  # Run steps for at most SLICE seconds, then schedule the rest
+  def run(self, generation, steps):
+    if generation != self.generation:
+      self.cancelled += 1
+      return
+    start = time.time()
+    try:
+      while time.time() - start < SLICE:
+        next(steps)
+    except StopIteration:
+      return
+    except (gdb.error, gdb.GdbError, RuntimeError):
+      # The program is running again, or the code cannot be decoded
+      return
+    finally:
+      self.slices += 1
+      self.longest = max(self.longest, time.time() - start)
+    self.schedule(generation, steps)
+
+  # Steps analyzing the current function, then its callees
+  def steps(self):
+    from sgdblib import analysis
+    yield
+    pc = analysis.current_pc()
+    if pc is None:
+      return
+    function = None
+    for step in self.analyze(analysis, pc):
+      function = step
+      yield
+    if function is None:
+      return
+    callees = []
+    for insn in function.instructions:
+      if insn.mnemonic in analysis.CALLS and insn.target is not None and \
+         not function.contains(insn.target) and insn.target not in callees:
+        callees.append(insn.target)
+    for address in callees[:MAX_CALLEES]:
+      try:
+        for step in self.analyze(analysis, address):
+          yield
+      except (gdb.error, gdb.GdbError):
+        continue
+
+  # Steps decoding and analyzing the function at address. Each step
+  # yields the function decoded so far (None until it is decoded).
+  def analyze(self, analysis, address):
+    cache = analysis.analysis_cache
+    # Scraping "disas" would decode the whole function in one step
+    name, start, end = analysis.function_range("0x%x" % address,
+                                               disas=False)
+    key = (analysis.objfile_key(start), start, end)
+    function = cache.lookup(key)
+    if function is None:
+      arch = analysis.current_architecture()
+      instructions = []
+      while start < end:
+        batch = arch.disassemble(start, end - 1, DECODE_SLICE)
+        if not batch:
+          break
+        instructions.extend(analysis.make_instruction(i) for i in batch)
+        start = batch[-1]["addr"] + batch[-1]["length"]
+        yield None
+      # A command may have decoded it in between
+      function = cache.lookup(key) or cache.add(key, name, instructions)
+      self.functions += 1
+    yield function
+    for name, analyze, render in [
+        ("loops", analysis.LoopForest, analysis.render_loop_report),
+        ("recursion", analysis.recursive_calls,
+         analysis.render_recursion_report)]:
+      cache.analysis(function, name, analyze)
+      yield function
+      analysis.rendered(function, name, render)
+      yield function
+
+pre_analysis = PreAnalysis()
+
+
+
+# sgdb prefetch command
+def prefetch(arg, from_tty):
+  words = arg.split()
+  if len(words) == 1 and words[0] in ("on", "off"):
+    pre_analysis.enabled = words[0] == "on"
+    if not pre_analysis.enabled:
+      pre_analysis.cancel()
+  elif len(words) > 0:
+    raise gdb.GdbError("Usage: sgdb prefetch [on|off]")
+  write("\n".join([
+      colors.bold + "Pre-analysis after each stop: %s" %
+      ("on" if pre_analysis.enabled else "off") + colors.nc,
+      "  functions analyzed : %d" % pre_analysis.functions,
+      "  slices             : %d (longest %.1f ms)" %
+      (pre_analysis.slices, pre_analysis.longest * 1000),
+      "  cancelled          : %d" % pre_analysis.cancelled]) + "\n")
@@ -0,0 +1,238 @@
+#################################################
+# S-GDB : command profiler                      #
+#################################################
+
+# Imports
+import cProfile
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import math
+import sys
+import time
+from collections import deque
+from sgdblib.common import colors
+from sgdblib.output import Output, write
+
+
+
+# ======= Profiler =======
+# "sgdb profile on" replaces the invoke method of every S-GDB command,
+# gdb.execute and sgdblib.memory.read_bytes with versions that time each
+# call, and "sgdb profile off" puts the originals back, so nothing is
+# measured (and nothing is slower) while the profiler is off. With
+# --cprofile, each command also runs under cProfile and the profile of
+# the last one can be saved with "sgdb profile dump <file>".
+
+# Durations kept per entry for the percentiles
+SAMPLES = 4096
+
+# Calls, time and bytes of one command, GDB command or kind of read
+class Stat(object):
+  __slots__ = ("calls", "seconds", "bytes", "samples")
+
+  def __init__(self):
+    self.calls = 0
+    self.seconds = 0.0
+    self.bytes = 0
+    self.samples = deque(maxlen=SAMPLES)
+
+  def add(self, seconds, size=0):
+    self.calls += 1
+    self.seconds += seconds
+    self.bytes += size
+    self.samples.append(seconds)
+
+  # Duration below which a fraction of the kept calls took
+  def percentile(self, fraction):
+    ordered = sorted(self.samples)
+    return ordered[max(0, int(math.ceil(fraction * len(ordered))) - 1)]
+
+# Name of the statistics of a GDB command: its first word, or its first
+# two for info and show ("info symbol", "show endian")
+def execute_name(command):
+  words = command.split(None, 2)
+  if len(words) > 1 and words[0] in ("info", "show"):
+    return "gdb.execute " + " ".join(words[:2])
+  return "gdb.execute " + (words[0] if words else "")
+
+class Profiler(object):
+  def __init__(self):
+    self.enabled = False
+    self.stats = {}
+    self.patched = []      # (owner, attribute, original)
+    self.depth = 0         # commands being run (they can run each other)
+    self.cprofile = False
+    self.last = None       # cProfile.Profile of the last command
+    self.last_name = None
+    self.read_bytes = None
+    self.timed_read = None
+
+  def stat(self, name):
+    stat = self.stats.get(name)
+    if stat is None:
+      stat = self.stats[name] = Stat()
+    return stat
+
+  # Replace owner.attribute with wrapper(original)
+  def patch(self, owner, attribute, wrapper):
+    original = vars(owner)[attribute]
+    self.patched.append((owner, attribute, original))
+    setattr(owner, attribute, wrapper(original))
+
+  # Timed version of a command's invoke method
+  def command(self, name, invoke):
+    stat = self.stat(name)
+    profiler = self
+    def timed_invoke(command, arg, from_tty):
+      profile = None
+      if profiler.cprofile and profiler.depth == 0:
+        profile = cProfile.Profile()
+        profile.enable()
+      profiler.depth += 1
+      start = time.time()
+      try:
+        return invoke(command, arg, from_tty)
+      finally:
+        stat.add(time.time() - start)
+        profiler.depth -= 1
+        if profile is not None:
+          profile.disable()
+          profiler.last = profile
+          profiler.last_name = ("%s %s" % (name, arg)).strip()
+    return timed_invoke
+
+  # Timed version of gdb.execute, counting the text returned
+  def execute(self, execute):
+    def timed_execute(command, *args, **kwargs):
+      start = time.time()
+      result = execute(command, *args, **kwargs)
+      name = execute_name(command)
+      self.stat(name).add(time.time() - start, len(result) if result else 0)
+      return result
+    return timed_execute
+
+  # Timed version of read_bytes, counting the bytes read
+  def read(self, read_bytes):
+    stat = self.stat("read memory")
+    def timed_read(address, length):
+      start = time.time()
+      result = read_bytes(address, length)
+      stat.add(time.time() - start, length)
+      return result
+    return timed_read
+
+  # commands: the gdb.Command classes of S-GDB, by name
+  def start(self, commands, cprofile=False):
+    self.cprofile = cprofile
+    if self.enabled:
+      return
+    self.enabled = True
+    for name, command_class in commands.items():
+      # Prefix commands (sgdb, sgdb cache) have no invoke of their own
+      if "invoke" in vars(command_class) and \
+         not name.startswith("sgdb profile"):
+        self.patch(command_class, "invoke",
+                   lambda invoke, name=name: self.command(name, invoke))
+    self.patch(gdb, "execute", self.execute)
+    # Modules that imported read_bytes by name use the timed version too
+    from sgdblib import memory
+    self.read_bytes = memory.read_bytes
+    self.timed_read = self.read(memory.read_bytes)
+    self.replace_read(self.read_bytes, self.timed_read)
+
+  # Replace read_bytes in every sgdblib module that has it
+  def replace_read(self, old, new):
+    for name, module in sys.modules.items():
+      if name.startswith("sgdblib.") and module is not None and \
+         getattr(module, "read_bytes", None) is old:
+        module.read_bytes = new
+
+  def stop(self):
+    if not self.enabled:
+      return
+    for owner, attribute, original in reversed(self.patched):
+      setattr(owner, attribute, original)
+    self.patched = []
+    # Including the modules loaded while the profiler was on
+    self.replace_read(self.timed_read, self.read_bytes)
+    self.enabled = False
+    self.depth = 0
+
+  # Forget the measurements (the wrappers keep their Stat objects)
+  def reset(self):
+    for stat in self.stats.values():
+      stat.__init__()
+    self.last = None
+    self.last_name = None
+
+profiler = Profiler()
+
+
+
+# ======= Report =======
+
+# Milliseconds, with a precision that suits them
+def milliseconds(seconds):
+  if seconds < 0.01:
+    return "%.3f" % (seconds * 1000)
+  return "%.1f" % (seconds * 1000)
+
+# Bytes as B, KiB or MiB
+def byte_count(count):
+  if count >= 1 << 20:
+    return "%.1f MiB" % (count / float(1 << 20))
+  if count >= 1 << 10:
+    return "%.1f KiB" % (count / float(1 << 10))
+  return "%d B" % count
+
+# sgdb profile report: one line per entry, longest total time first
+def report():
+  out = Output()
+  out.line(colors.bold + "S-GDB profile (%s)" %
+           ("on" if profiler.enabled else "off") + colors.nc)
+  stats = [(name, stat) for name, stat in profiler.stats.items()
+           if stat.calls > 0]
+  if not stats:
+    out.line("  Nothing measured yet. Use sgdb profile on and run commands.")
+  else:
+    out.line("  %-28s %7s %10s %9s %9s %9s %9s %10s" % (
+        "", "calls", "total ms", "mean ms", "p50 ms", "p90 ms", "p99 ms",
+        "bytes"))
+  for name, stat in sorted(stats, key=lambda item: -item[1].seconds):
+    out.line("  %-28s %7d %10s %9s %9s %9s %9s %10s" % (
+        name, stat.calls, milliseconds(stat.seconds),
+        milliseconds(stat.seconds / stat.calls),
+        milliseconds(stat.percentile(0.5)),
+        milliseconds(stat.percentile(0.9)),
+        milliseconds(stat.percentile(0.99)),
+        byte_count(stat.bytes) if stat.bytes else "-"))
+  if profiler.last is not None:
+    out.line("  cProfile of the last command: %s (sgdb profile dump <file>)"
+             % profiler.last_name)
+  out.flush()
+
+# sgdb profile command. commands: the gdb.Command classes of S-GDB, by
+# name
+def profile(arg, from_tty, commands):
+  words = arg.split()
+  if len(words) == 0 or words == ["report"]:
+    report()
+  elif words[0] == "on" and words[1:] in ([], ["--cprofile"]):
+    profiler.start(commands, cprofile=len(words) > 1)
+    write("Profiling S-GDB commands%s.\n" %
+          (" (with cProfile)" if profiler.cprofile else ""))
+  elif words == ["off"]:
+    profiler.stop()
+    write("Profiling off.\n")
+  elif words == ["reset"]:
+    profiler.reset()
+    write("Profile cleared.\n")
+  elif words[0] == "dump" and len(words) == 2:
+    if profiler.last is None:
+      raise gdb.GdbError("No cProfile yet: use sgdb profile on --cprofile "
+                         "and run a command.")
+    profiler.last.dump_stats(words[1])
+    write("cProfile of %s saved to %s (read it with pstats).\n" %
+          (profiler.last_name, words[1]))
+  else:
+    raise gdb.GdbError("Usage: sgdb profile on [--cprofile]|off|report|"
+                       "reset|dump <file>")
@@ -0,0 +1,248 @@
+#################################################
+# S-GDB : sampling profiler                     #
+#################################################
+
+# Imports
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from sgdblib.common import colors
+from sgdblib.output import Output, write
+
+
+
+# ======= Sampler =======
+# profile sample continues the program with "continue", whose output is
+# captured and dropped, while a timer thread sends it SIGSTOP hz times
+# per second. The stop ends the continue, $pc and the functions of the
+# backtrace are recorded, and the program is continued again. GDB does
+# not pass SIGSTOP on to the program, and nothing is printed per sample.
+# When the time is up the program is left stopped and the profile is
+# shown. Stopping at a breakpoint, the program exiting or Ctrl-C (the
+# program stops with SIGINT) ends it earlier.
+#
+# The samples are kept per instruction, per function (the function that
+# was running, and every function of the backtrace) and per backtrace.
+# show loops --samples and show code --samples show them over the code.
+
+# Frames of the backtrace kept with each sample
+STACK_DEPTH = 16
+# Lines of each table of the report
+REPORT_LINES = 10
+
+class Sampler(object):
+  def __init__(self):
+    self.sampling = False
+    self.running = False     # the program was continued by the sampler
+    self.event = None        # last stop event
+    self.clear()
+
+  def clear(self):
+    self.samples = 0
+    self.pcs = Counter()         # address -> samples
+    self.functions = Counter()   # function running -> samples
+    self.inclusive = Counter()   # function in the backtrace -> samples
+    self.stacks = Counter()      # backtrace (innermost first) -> samples
+    self.seconds = 0.0
+    self.reason = None
+
+  # Timer thread: stop the program every period while it runs
+  def timer(self, pid, period, deadline):
+    while self.sampling and time.time() < deadline:
+      time.sleep(period)
+      if self.running:
+        try:
+          os.kill(pid, signal.SIGSTOP)
+        except OSError:
+          return
+
+  # gdb.events.stop, while sampling
+  def on_stop(self, event):
+    self.event = event
+
+  # Sample the program for seconds, hz times per second, then show the
+  # profile
+  def run(self, hz, seconds):
+    self.clear()
+    pid = gdb.selected_inferior().pid
+    started = time.time()
+    deadline = started + seconds
+    self.sampling = True
+    # The stops of the samples are not worth analyzing in the background
+    prefetch = sys.modules.get("sgdblib.prefetch")
+    enabled = prefetch is not None and prefetch.pre_analysis.enabled
+    if enabled:
+      prefetch.pre_analysis.enabled = False
+    gdb.events.stop.connect(self.on_stop)
+    thread = threading.Thread(target=self.timer,
+                              args=(pid, 1.0 / hz, deadline))
+    thread.daemon = True
+    thread.start()
+    reason = "%g seconds" % seconds
+    try:
+      while True:
+        self.event = None
+        self.running = True
+        try:
+          gdb.execute("continue", to_string=True)
+        finally:
+          self.running = False
+        if gdb.selected_inferior().pid == 0:
+          reason = "the program exited"
+          break
+        stop_signal = getattr(self.event, "stop_signal", None)
+        if stop_signal == "SIGINT":
+          reason = "interrupted"
+          break
+        if stop_signal != "SIGSTOP":
+          reason = "the program stopped"
+          break
+        self.record()
+        if time.time() >= deadline:
+          break
+    except KeyboardInterrupt:
+      reason = "interrupted"
+    except gdb.error as error:
+      reason = str(error).rstrip(".")
+    finally:
+      self.sampling = False
+      gdb.events.stop.disconnect(self.on_stop)
+      if enabled:
+        prefetch.pre_analysis.enabled = True
+      self.seconds = time.time() - started
+      self.reason = reason
+    self.report()
+
+  def record(self):
+    try:
+      frame = gdb.newest_frame()
+      pc = frame.pc()
+    except gdb.error:
+      return
+    names = []
+    while frame is not None and len(names) < STACK_DEPTH:
+      names.append(frame.name() or "0x%x" % frame.pc())
+      try:
+        frame = frame.older()
+      except gdb.error:
+        break
+    self.samples += 1
+    self.pcs[pc] += 1
+    self.functions[names[0]] += 1
+    self.inclusive.update(set(names))
+    self.stacks[tuple(names)] += 1
+
+  # Percentage of the samples
+  def percent(self, count):
+    return 100.0 * count / self.samples if self.samples else 0.0
+
+  # Name and offset of an address, like main+12
+  def describe(self, address):
+    try:
+      block = gdb.block_for_pc(address)
+    except RuntimeError:
+      block = None
+    while block is not None and block.function is None:
+      block = block.superblock
+    if block is None:
+      return "0x%x" % address
+    return "0x%x <%s+%d>" % (address, block.function.name,
+                             address - block.start)
+
+  def report(self):
+    out = Output()
+    out.line(colors.bold + "%d samples in %.1fs (stopped: %s)" %
+             (self.samples, self.seconds, self.reason or "sampling") +
+             colors.nc)
+    if self.samples == 0:
+      out.flush()
+      return
+    out.line(colors.bold + "  %7s %7s  %s" % ("self", "total", "function") +
+             colors.nc)
+    for name, count in self.functions.most_common(REPORT_LINES):
+      out.line("  %6.1f%% %6.1f%%  %s" % (self.percent(count),
+               self.percent(self.inclusive[name]), name))
+    out.line(colors.bold + "  Instructions" + colors.nc)
+    for address, count in self.pcs.most_common(REPORT_LINES):
+      out.line("  %6.1f%%  %s" % (self.percent(count),
+                                  self.describe(address)))
+    out.line(colors.bold + "  Backtraces" + colors.nc)
+    for stack, count in self.stacks.most_common(REPORT_LINES):
+      out.line("  %6.1f%%  %s" % (self.percent(count),
+                                  " <- ".join(stack)))
+    out.line("Use show loops --samples or show code --samples to see them "
+             "over the code.")
+    out.flush()
+
+  # Samples of each source line of a file, by line number
+  def lines(self, filename):
+    lines = Counter()
+    for address, count in self.pcs.items():
+      sal = gdb.find_pc_line(address)
+      if sal.symtab is not None and sal.symtab.filename == filename:
+        lines[sal.line] += count
+    return lines
+
+sampler = Sampler()
+
+
+
+# profile sample command
+def profile_sample(arg, from_tty):
+  from sgdblib.memory import direct_reader
+  words = arg.split()
+  usage = "Usage: profile sample <hz> <seconds>"
+  if len(words) == 0:
+    if sampler.samples == 0:
+      raise gdb.GdbError(usage)
+    sampler.report()
+    return
+  try:
+    hz, seconds = float(words[0]), float(words[1])
+  except (IndexError, ValueError):
+    raise gdb.GdbError(usage)
+  if len(words) != 2 or hz <= 0 or seconds <= 0:
+    raise gdb.GdbError(usage)
+  if gdb.selected_inferior().pid == 0:
+    raise gdb.GdbError("The program is not being run. Start it first.")
+  # The timer signals the program's process, which must be on this
+  # machine
+  if not direct_reader.native():
+    raise gdb.GdbError("profile sample only works on programs GDB runs "
+                       "itself, not on remote targets.")
+  write("Sampling at %g Hz for %gs (Ctrl-C to stop)...\n" % (hz, seconds))
+  sampler.run(hz, seconds)
+
+# show code --samples: the source of a function with the percentage of
+# the samples taken on each line
+def show_code(arg, from_tty):
+  from sgdblib.analysis import heat_color
+  if sampler.samples == 0:
+    raise gdb.GdbError("No samples yet. Use profile sample first.")
+  symbol = gdb.lookup_global_symbol(arg) if arg else None
+  if symbol is None and arg:
+    symbol = gdb.lookup_symbol(arg)[0]
+  if symbol is not None and symbol.symtab is not None:
+    filename = symbol.symtab.filename
+  else:
+    sal = gdb.selected_frame().find_sal()
+    if sal.symtab is None:
+      raise gdb.GdbError("No source for " + (arg or "this code") + ".")
+    filename = sal.symtab.filename
+  lines = sampler.lines(filename)
+  hottest = max(lines.values() or [0])
+  text = gdb.execute("list %s" % arg, to_string=True)
+  out = Output()
+  for line in text.splitlines():
+    number = line.split("\t", 1)[0].strip()
+    count = lines.get(int(number), 0) if number.isdigit() else 0
+    if count == 0:
+      out.line("        " + line)
+      continue
+    out.line(heat_color(count, hottest) + "%6.1f%% " %
+             sampler.percent(count) + line + colors.nc)
+  out.flush()
@@ -0,0 +1,261 @@
+#################################################
+# S-GDB : stack visualization                   #
+#################################################
+
+# Imports
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import struct
+from sgdblib.common import colors
+from sgdblib.memory import ASCII_TABLE, read_bytes, to_bytes
+from sgdblib.output import write
+
+
+
+# ======= Frames =======
+# Each frame covers the stack from its $rsp up to its CFA (the value of
+# $rsp before the call that created it, which is the $rsp of the caller).
+# The whole range is read with a single read_bytes() call and split into
+# the return address, the registers saved by the prologue, the local
+# variables known to GDB and raw 8-byte slots.
+#
+# Frames are cached by frame id (function and CFA, like GDB does). After
+# a stepi only the innermost frame and the frames whose range changed are
+# read again; the other frames of the caller chain are reused. A stop at
+# a breakpoint or on a signal can come after any amount of code ran (a
+# loop of the caller calling the function again has the same frame ids),
+# so the callers read before it are not reused. Use "show stack refresh"
+# after a call wrote into a caller's variables.
+
+# Size of a stack slot
+SLOT_SIZE = 8
+# Lines shown at each end of a frame, unless "full" is given
+EDGE_LINES = 24
+# struct codes of the values that fit in a slot
+CODES = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+# Registers pushed by the prologue of a function, as (end of the push
+# instruction, register) in push order
+def saved_registers(function):
+  saved = []
+  for insn in function.instructions:
+    if insn.mnemonic == "push" and insn.operands.startswith("%"):
+      saved.append((insn.addr + insn.length, insn.operands[1:]))
+    elif insn.mnemonic not in ("endbr64", "mov", "nop"):
+      break
+    elif insn.mnemonic == "mov" and insn.operands != "%rsp,%rbp":
+      break
+  return saved
+
+# (address, size, name, type) of the variables of frame stored in
+# [low, high), from the debug information
+def frame_variables(frame, low, high):
+  try:
+    block = frame.block()
+  except RuntimeError:
+    return []
+  variables = []
+  seen = set()
+  while block is not None:
+    for symbol in block:
+      if not (symbol.is_variable or symbol.is_argument):
+        continue
+      if symbol.name in seen:
+        continue
+      seen.add(symbol.name)
+      try:
+        address = int(symbol.value(frame).address)
+      except (gdb.error, TypeError):
+        continue
+      if low <= address < high:
+        variables.append((address, symbol.type.sizeof, symbol.name,
+                          str(symbol.type)))
+    if block.function is not None:
+      break
+    block = block.superblock
+  return variables
+
+# A frame read from the stack
+class StackFrame(object):
+
+  def __init__(self, key, frame, low, high, generation):
+    self.key = key
+    self.name = frame.name() or "??"
+    self.pc = int(frame.pc())
+    self.low = low
+    self.high = high
+    self.rbp = int(frame.read_register("rbp"))
+    self.generation = generation
+    self.data = to_bytes(read_bytes(low, high - low)) if high > low else ""
+    # (address, size, label, type) of the known slots
+    self.items = []
+    if high - low >= SLOT_SIZE:
+      self.items.append((high - SLOT_SIZE, SLOT_SIZE, "return address",
+                         "code"))
+    for index, register in enumerate(self.saved_registers()):
+      self.items.append((high - 2 * SLOT_SIZE - index * SLOT_SIZE,
+                         SLOT_SIZE, "saved " + register, "register"))
+    self.items += frame_variables(frame, low, high)
+    self.items = [item for item in self.items if low <= item[0] < high]
+    self.items.sort(reverse=True)
+
+  # Registers already pushed by the prologue of the frame's function
+  def saved_registers(self):
+    from sgdblib.analysis import analysis_cache
+    try:
+      function = analysis_cache.function(hex(self.pc))
+    except (gdb.error, gdb.GdbError):
+      return []
+    saved = analysis_cache.analysis(function, "saved registers",
+                                    saved_registers)
+    return [register for end, register in saved if end <= self.pc]
+
+  # Bytes [address, address + size) of the frame
+  def bytes(self, address, size):
+    return self.data[address - self.low:address - self.low + size]
+
+  # (address, size, label, type) of everything in the frame, from the
+  # highest address down, with raw slots between the known ones
+  def segments(self):
+    top = self.high
+    for address, size, label, kind in self.items + [(self.low, 0, None, None)]:
+      end = min(address + size, top)
+      # Raw slots between this item and the previous one
+      while top > end:
+        start = max(end, top - (top % SLOT_SIZE or SLOT_SIZE))
+        yield start, top - start, None, None
+        top = start
+      if size > 0 and address < top:
+        yield address, top - address, label, kind
+        top = address
+
+  # Text of the value of a segment
+  def value(self, address, size, kind):
+    data = self.bytes(address, size)
+    if kind == "code":
+      number = struct.unpack("<Q", data)[0]
+      symbol = gdb.execute("info symbol 0x%x" % number, to_string=True)
+      if symbol.startswith("No symbol"):
+        return "0x%016x" % number
+      return "0x%016x <%s>" % (number, symbol.split(" in ")[0].strip())
+    if size in CODES:
+      number = struct.unpack("<" + CODES[size], data)[0]
+      return "0x%0*x" % (size * 2, number)
+    preview = data[:16]
+    return "%s  |%s|%s" % (" ".join("%02x" % value
+                                    for value in bytearray(preview)),
+                           preview.translate(ASCII_TABLE),
+                           " ..." if size > 16 else "")
+
+  # Lines showing the frame
+  def render(self, level, rsp, full=False):
+    lines = [colors.bold + "#%-3d %s" % (level, self.name) + colors.nc +
+             "  pc 0x%x, 0x%x - 0x%x (%d bytes)" %
+             (self.pc, self.low, self.high, self.high - self.low)]
+    previous = None
+    for address, size, label, kind in self.segments():
+      marks = []
+      if address <= self.rbp < address + size:
+        marks.append("<- rbp")
+      if address <= rsp < address + size:
+        marks.append("<- rsp")
+      if label is None and not marks:
+        data = self.bytes(address, size)
+        if data == previous and size == SLOT_SIZE:
+          if lines[-1] != "  *":
+            lines.append("  *")
+          continue
+        previous = data
+      else:
+        previous = None
+      text = "  0x%016x  %s%-18s%s %s" % (address, colors.green,
+                                         label or "", colors.nc,
+                                         self.value(address, size, kind))
+      if kind is not None and kind not in ("code", "register"):
+        text += colors.cyan + "  " + kind + colors.nc
+      if marks:
+        text += colors.yellow + "  " + " ".join(marks) + colors.nc
+      lines.append(text)
+    if not full and len(lines) > 2 * EDGE_LINES + 2:
+      hidden = len(lines) - 2 * EDGE_LINES - 1
+      lines = lines[:EDGE_LINES + 1] + \
+          ["  ... %d lines (show stack full) ..." % hidden] + \
+          lines[-EDGE_LINES:]
+    return lines
+
+# Frames read so far, by frame id
+class FrameCache(object):
+
+  def __init__(self):
+    self.frames = {}
+    self.generation = 0   # number of stops seen
+    self.resumed = 0      # generation of the last stop that was not a step
+    self.reads = 0
+    self.reused = 0
+
+  # gdb.events.stop: the innermost frame has to be read again, and every
+  # frame after a stop that was not a step
+  def on_stop(self, event):
+    self.generation += 1
+    if isinstance(event, (gdb.BreakpointEvent, gdb.SignalEvent)):
+      self.resumed = self.generation
+
+  # gdb.events.memory_changed / exited: cached contents are stale
+  def clear(self, event=None):
+    self.frames = {}
+
+  # StackFrame for each frame, innermost first
+  def walk(self, refresh=False):
+    try:
+      frame = gdb.newest_frame()
+    except gdb.error:
+      raise gdb.GdbError("The program is not being run.")
+    frames = {}
+    stack = []
+    innermost = True
+    while frame is not None:
+      older = frame.older()
+      low = int(frame.read_register("sp"))
+      if older is not None:
+        high = int(older.read_register("sp"))
+      else:
+        high = int(frame.read_register("rbp")) + 2 * SLOT_SIZE
+      if not low <= high <= low + (64 << 20):
+        break
+      key = (frame.name() or int(frame.pc()), high)
+      cached = self.frames.get(key)
+      if (cached is not None and not refresh and cached.low == low and
+          cached.generation >= self.resumed and
+          (not innermost or cached.generation == self.generation)):
+        self.reused += 1
+      else:
+        cached = StackFrame(key, frame, low, high, self.generation)
+        self.reads += 1
+      frames[key] = cached
+      stack.append(cached)
+      innermost = False
+      frame = older
+    self.frames = frames
+    return stack
+
+frame_cache = FrameCache()
+
+
+
+# show stack command
+# Task: show each frame of the stack, from the innermost one, with its
+# return address, saved registers, local variables and raw slots
+def show_stack(arg, from_tty):
+  words = arg.split()
+  for word in words:
+    if word not in ("full", "refresh"):
+      raise gdb.GdbError("Usage: show stack [full] [refresh]")
+  reads, reused = frame_cache.reads, frame_cache.reused
+  stack = frame_cache.walk("refresh" in words)
+  rsp = int(gdb.newest_frame().read_register("sp"))
+  lines = []
+  for level, frame in enumerate(stack):
+    lines += frame.render(level, rsp, "full" in words)
+    lines.append("")
+  lines.append("%d frames, %d read from memory, %d reused" % (
+      len(stack), frame_cache.reads - reads, frame_cache.reused - reused))
+  write("\n".join(lines) + "\n")
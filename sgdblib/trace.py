@@ -0,0 +1,148 @@
+#################################################
+# S-GDB : single-step tracer                    #
+#################################################
+
+# Imports
+import gdb  # module defined by GDB, cannot be used outside of gdb
+import sys
+import time
+from array import array
+from collections import Counter
+from sgdblib.common import colors
+from sgdblib.output import Output, write
+
+
+
+# ======= Tracer =======
+# itrace start runs stepi in a loop, without printing anything, and
+# keeps the address of every instruction run in a ring buffer: an array
+# of 64-bit integers allocated once, where instruction n goes to slot
+# n % size. Tracing stops after the requested number of instructions,
+# when the program exits or on Ctrl-C. show loops --heat shows how many
+# times each instruction in the buffer ran.
+
+# Instructions kept in the buffer, by default
+TRACE_SIZE = 1 << 20
+# Instructions run by itrace start, by default
+TRACE_STEPS = 100000
+
+# Type code of 64-bit unsigned integers: python 2 has no "Q", but its
+# "L" (unsigned long) is 64 bits long on 64-bit Linux
+try:
+  ADDRESS = array("Q").typecode
+except ValueError:
+  ADDRESS = "L"
+
+class Tracer(object):
+  def __init__(self):
+    self.buffer = array(ADDRESS)
+    self.total = 0        # instructions traced since the buffer was made
+    self.seconds = 0.0    # time spent tracing them
+
+  # Instructions of the trace that are still in the buffer
+  def recorded(self):
+    return min(self.total, len(self.buffer))
+
+  # Times each address of the buffer ran
+  def counts(self):
+    return Counter(self.buffer[:self.recorded()])
+
+  # Run up to steps instructions. Returns the instructions run, the
+  # time it took and why tracing stopped.
+  def run(self, steps, size):
+    if len(self.buffer) != size:
+      self.buffer = array(ADDRESS, [0]) * size
+      self.total = 0
+      self.seconds = 0.0
+    buffer = self.buffer
+    total = self.total
+    execute = gdb.execute
+    selected_frame = gdb.selected_frame
+    # The stops of stepi are not worth analyzing in the background
+    prefetch = sys.modules.get("sgdblib.prefetch")
+    enabled = prefetch is not None and prefetch.pre_analysis.enabled
+    if enabled:
+      prefetch.pre_analysis.enabled = False
+    reason = "%d instructions" % steps
+    start = time.time()
+    try:
+      for n in xrange(steps):
+        buffer[total % size] = selected_frame().pc()
+        execute("stepi", to_string=True)
+        total += 1
+    except KeyboardInterrupt:
+      reason = "interrupted"
+    except gdb.error as error:
+      if gdb.selected_inferior().pid == 0:
+        reason = "the program exited"
+      else:
+        reason = str(error).rstrip(".")
+    finally:
+      seconds = time.time() - start
+      self.seconds += seconds
+      count = total - self.total
+      self.total = total
+      if enabled:
+        prefetch.pre_analysis.enabled = True
+    return count, seconds, reason
+
+  def clear(self):
+    self.buffer = array(ADDRESS)
+    self.total = 0
+    self.seconds = 0.0
+
+  def status(self):
+    rate = self.total / self.seconds if self.seconds > 0 else 0
+    return ("%d instructions traced in %.2fs (%.0f instructions/s), "
+            "the last %d in the buffer of %d" %
+            (self.total, self.seconds, rate, self.recorded(),
+             len(self.buffer)))
+
+tracer = Tracer()
+
+
+
+# itrace command
+def trace(arg, from_tty):
+  words = arg.split()
+  usage = "Usage: itrace start [<instructions>] [--buffer <size>]\n" \
+          "       itrace stop"
+  if len(words) == 0:
+    if tracer.total == 0:
+      write("Nothing traced.\n")
+    else:
+      write(tracer.status() + "\n")
+    return
+  if words == ["stop"]:
+    if tracer.total > 0:
+      write(tracer.status() + "\n")
+    tracer.clear()
+    return
+  if words[0] != "start":
+    raise gdb.GdbError(usage)
+  steps = TRACE_STEPS
+  size = len(tracer.buffer) or TRACE_SIZE
+  words = words[1:]
+  while words:
+    if words[0] == "--buffer" and len(words) > 1 and \
+        words[1].isdigit() and int(words[1]) > 0:
+      size = int(words[1])
+      words = words[2:]
+    elif words[0].isdigit():
+      steps = int(words[0])
+      words = words[1:]
+    else:
+      raise gdb.GdbError(usage)
+  try:
+    gdb.selected_frame()
+  except gdb.error:
+    raise gdb.GdbError("The program is not being run.")
+  count, seconds, reason = tracer.run(steps, size)
+  out = Output()
+  out.line(colors.bold + "Traced %d instructions in %.2fs (%.0f "
+           "instructions/s), stopped: %s" %
+           (count, seconds, count / seconds if seconds > 0 else 0, reason) +
+           colors.nc)
+  out.line(tracer.status())
+  out.line("Use show loops --heat <function> to see where they ran.")
+  out.flush()
@@ -0,0 +1,406 @@
+#################################################
+# S-GDB : interactive tutorial                  #
+#################################################
+
+# Imports
+import gdb  # module defined by GDB, cannot be used outside of gdb
+from sgdblib.common import colors, handle_quit
+from sgdblib.output import Output
+
+
+
+# tutorial command
+def tutorial(args, from_tty):
+
+  # String for prompt
+  prompt = "(s-gdb) "
+  wrong_command_1 = "Wrong command! Enter "
+  wrong_command_2 = " or quit (to quit this tutorial)."
+  out = Output()
+
+  # Intro and instructions
+  out.line(colors.bold + colors.green)
+  out.line("----------------------------------------------------------------")
+  out.line(" S-GDB Tutorial")
+  out.line("----------------------------------------------------------------")
+  out.line("")
+  out.line("Welcome! This tutorial features an interactive excersice for")
+  out.line("beginner users to learn more about the power behind binary")
+  out.line("analysis. But with great power, comes great responsability.")
+  out.line(colors.u + "So please, use these powers responsibly." + colors.nc)
+  out.line(colors.bold + colors.green + colors.i)
+  out.line("You noticed one day that your parents use an interesting program")
+  out.line("to keep track of important things. You birthday is coming up,")
+  out.line("and while you have been hinting for months that you want one of")
+  out.line("those new iPhone 6174, you want to make sure that they really")
+  out.line("got it. You are pretty sure that they wrote down on this secret")
+  out.line("program what gift they got you. You run the program... and bam!")
+  out.line("You parents aren't dumb... their secrets are protected by a")
+  out.line("password.\n")
+  out.line("The only problem is that you only see the executable... no code!")
+  out.line("This means that you cannot open the notes.c file and read the")
+  out.line("source code to figure out how the program works.")
+  out.line("Well... luckily, you have been paying attention during your")
+  out.line("computer security class. So let's see if we can analyze the")
+  out.line("program and get to the bottom of this: your birthday present!")
+  out.line(colors.nc + colors.bold + colors.green)
+  out.line(" --- To exit this tutorial enter q or quit. ---\n")
+  
+  # 1. Loading Executable
+  out.line("(1) The first task is to learn more about the program itself.")
+  out.line("    So first, let's give GDB access to the binary so we can")
+  out.line("    further analyze it. Since the name of the executable is")
+  out.line("    notes, run the command: file notes" + colors.nc)
+  # Process command to load the executable into GDB
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  # Handle input errors
+  while (command != "file notes"):
+    out.line(wrong_command_1 + "file notes" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  # Execute the actual command
+  out.flush()
+  gdb.execute(command)
+
+  # 2. Learning about the program: function list
+  out.line(colors.bold + colors.green)
+  out.line("(2) Now that the program is loaded, GDB can tell us more about")
+  out.line("    it. Let's see if we can find a list of functions.")
+  out.line("    Enter the command: info functions" + colors.nc)
+  # Process command to list functions in a program
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "info functions"):
+    out.line(wrong_command_1 + "into functions" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  # Execute the actual command
+  out.flush()
+  gdb.execute(command)
+
+  # 3. Learning about the program: display function code
+  out.line(colors.bold + colors.green)
+  out.line("(3) You can see that there is a main function listed. As you")
+  out.line("    know, main is typically where a program starts executing")
+  out.line("    so let's start looking at instructions there.")
+  out.line("    Enter the command: disas main" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "disas main"):
+    out.line(wrong_command_1 + "disas main" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  # Execute the actual command
+  out.flush()
+  gdb.execute(command)
+
+  # 4, Learning about the program: display info about ????
+  out.line(colors.bold + colors.green)
+  out.line("(4) By disassembling main, we now have access to the")
+  out.line("    instructions that will be executed when the program")
+  out.line("    is running. There are a lot of hints here, so let's")
+  out.line("    take a deeper look.")
+  out.line("    If these instructions look confusing to you, you can")
+  out.line("    use the command: instruction info push, for example.")
+  out.line("    This will display information about the push")
+  out.line("    instructions.")
+  out.line("")
+  out.line("    Enter the command: instruction push" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "instruction push"):
+    out.line(wrong_command_1 + "instruction push" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  # Execute command
+  out.flush()
+  gdb.execute(command)
+
+  # 5. Binary Analysis: interpreting instructions & breakpoints
+  out.line(colors.bold + colors.green)
+  out.line("(5) Let's start by looking at the first 3 instructions in")
+  out.line("    main. The first instruction, push %rbp, and the third")
+  out.line("    instruction, push %rbx, save the current values on")
+  out.line("    those registers so that they function can use them.")
+  out.line("    The second instruction, mov %rsp,%rbp, sets the new")
+  out.line("    base of the stack (where the stack begins).")
+  out.line("")
+  out.line("    The fourth instruction, sub $0x186e8,%rsp, moves the")
+  out.line("    stack pointer downwards. This increases the size of")
+  out.line("    the stack by 0x186e8.")
+  out.line("")
+  out.line("    The next 5 instructions seem to be setting some values")
+  out.line("    (such as 0x68 into address $rbp-0x186d8).")
+  out.line("")
+  out.line("    If we keep reading down, we find the first clue:fopen.")
+  out.line("    The program seems to be using the function fopen to")
+  out.line("    open some file. Let's explore this clue.")
+  out.line("")
+  out.line("    Since we know we are looking for either the contents of")
+  out.line("    of your parents secrets or the actual password we are")
+  out.line("    supposed to enter correctly, we can start examining the")
+  out.line("    contents of the memory at each stage. But before we do")
+  out.line("    that, we need to start running the program.")
+  out.line("")
+  out.line("    Setup a breakpoint so the program stops running at that")
+  out.line("    point. We choose to stop at the instruction +57.")
+  out.line("    Enter the command: b *main+57" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "b *main+57"):
+    out.line(wrong_command_1 + "b *main+57" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  out.flush()
+  gdb.execute(command)
+
+  # 6. Binary Analysis: running a program
+  out.line(colors.bold + colors.green)
+  out.line("(6) Now, we are ready to start running the program, since")
+  out.line("    we know it will stop at the instruction: mov $0x400988,%edx")
+  out.line("    Enter the command: run" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "run" and command != "r"):
+    out.line(wrong_command_1 + "run" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  gdb.execute(command, to_string=True)
+
+  # 7. Binary Analysis: finding the next instruction
+  out.line(colors.bold + colors.green)
+  out.line("(7) Let's see where we are at right now. To do that, we can")
+  out.line("    use the disassemble command. This command prints all the")
+  out.line("    instructions of the current function executing. Also, there")
+  out.line("    is an arrow on the left that marks the next instruction to")
+  out.line("    be executed.")
+  out.line("")
+  out.line("    Enter the command: disas" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "disas" and command != "disassemble"):
+    out.line(wrong_command_1 + "disas" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  out.flush()
+  gdb.execute(command)
+
+  # 8. Binary Analysis: stepping through the instructions
+  out.line(colors.bold + colors.green)
+  out.line("(8) As expected (since we added a breakpoint at main+57), the")
+  out.line("    instruction to be executed will be: mov $0x400988,%edx.")
+  out.line("    Let's run the program for 4 instructions so the next")
+  out.line("    instruction to be executed is callq 0x4005e8.")
+  out.line("    Enter the command: stepi 4" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "stepi 4" and command != "si 4"):
+    out.line(wrong_command_1 + "stepi 4" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  gdb.execute(command, to_string=True)
+
+  # 9. Binary Analysis: reading strings in memory
+  out.line(colors.bold + colors.green)
+  out.line("(9) Let's take a look at the arguments passed to the fopen")
+  out.line("    function. We might be able to find some useful string")
+  out.line("    at addresses 0x400988 and 0x40098a. So let's use the")
+  out.line("    memory command to help us.")
+  out.line("    Enter the command: memory")
+  out.line("    When asked, enter 0x400988 for the address and s for")
+  out.line("    the format (since we want to print strings at that")
+  out.line("    address, if there are any)" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "memory"):
+    out.line(wrong_command_1 + "memory" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  out.flush()
+  gdb.execute(command)
+
+  # 10. Binary Analysis: reading more strings
+  out.line(colors.bold + colors.green)
+  out.line("(10) Mmmm.. So at address 0x400988 there is a \"r\".")
+  out.line("     That probably means that the program is opening")
+  out.line("     a file with the reading flag. Let's look at the")
+  out.line("     next address (0x40098a) and see if there is also")
+  out.line("     a useful string there as well.")
+  out.line("     Enter the command: memory" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "memory"):
+    out.line(wrong_command_1 + "memory" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  out.flush()
+  gdb.execute(command)
+
+  # 11. Binary Analysis: stepping through
+  out.line(colors.bold + colors.green)
+  out.line("(11) Awesome! Looks like the secrets are in some file")
+  out.line("     called user.db. Okay, now let's keep executing")
+  out.line("     instructions.")
+  out.line("     Enter the command: stepi" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "stepi" and command != "si"):
+    out.line(wrong_command_1 + "stepi" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  gdb.execute(command, to_string=True)
+
+  # 12/13. Binary Analysis: the finish command
+  out.line(colors.bold + colors.green)
+  out.line("(12) Since the instruction we just executed was a call")
+  out.line("     instruction, the program's current function is no")
+  out.line("     longer main. We can see that by running disas again.")
+  out.line("     Enter the command: disas" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "disas"):
+    out.line(wrong_command_1 + "disas" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  out.flush()
+  gdb.execute(command)
+
+  out.line(colors.bold + colors.green)
+  out.line("(13) Looks like the current function being run is fopen")
+  out.line("     (which is expected). Let's get back to main. To do")
+  out.line("     do this, run the finish command (which executes all")
+  out.line("     instructions until it gets back to the caller: main).")
+  out.line("     Enter the command: finish" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "finish" and command != "fin"):
+    out.line(wrong_command_1 + "finish" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  out.flush()
+  gdb.execute(command)
+
+  # 14. Binary Analysis: analyzing fscanf
+  out.line(colors.bold + colors.green)
+  out.line("(14) Now we are back in main, and if we look further to")
+  out.line("     instruction +109, we can see that there is a call")
+  out.line("     being made to fscanf. Typically, fscanf is used to")
+  out.line("     read contents into some buffer (perhaps an array),")
+  out.line("     so let's look at the arguments being passed to")
+  out.line("     fscanf.")
+  out.line("     Enter the command: memory")
+  out.line("     (Address: 0x400992 and Format: s)" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "memory"):
+    out.line(wrong_command_1 + "memory" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  out.flush()
+  gdb.execute(command)
+
+  # 15. Binary Analysis: analyzing fscanf
+  out.line(colors.bold + colors.green)
+  out.line("(15) So at address 0x400992, we find what looks like a")
+  out.line("     string formatter. %[^~] matches all characters until")
+  out.line("     the character: ~. Let's keep looking ahead. The next")
+  out.line("     instruction seems to be saving the address of the")
+  out.line("     stack at offset 0x186d0 into the register rdx. This")
+  out.line("     might be a useful address after fscanf gets executed,")
+  out.line("     so let's not forget about it.")
+  out.line("     The instruction: mov -0x18(%rbp),%rax will put the")
+  out.line("     value that was at address rbp-0x18 into rax.")
+  out.line("     What could be so special about the value in rbp-0x18?")
+  out.line("     If we look back to instruction +78, we can see that")
+  out.line("     the returned value by fopen (which is a pointer to a")
+  out.line("     file) is being stored in rbp-0x18. This makes sense,")
+  out.line("     the program must be reading the contents of the file")
+  out.line("     and placing them in the stack (at address rbp-0x186d0)")
+  out.line("     until the ~ character is found on the file.")
+  out.line("     Let's execute the code until fscanf to test our theory.")
+  out.line("     Enter the command: stepi 8" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "stepi 8" and command != "si 8"):
+    out.line(wrong_command_1 + "stepi 8" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  gdb.execute(command, to_string=True)
+
+  out.line(colors.bold + colors.green)
+  out.line("     Now, enter the command: finish" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "finish" and command != "fin"):
+    out.line(wrong_command_1 + "finish" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  gdb.execute(command, to_string=True)
+
+  # 16. Binary Analysis: examining the stack
+  out.line(colors.bold + colors.green)
+  out.line("(16) Now, let's use the memory command to see if there is")
+  out.line("     any useful string at address rbp-0x186d0. To do this,")
+  out.line("     we can use the memory command, and when asked for the")
+  out.line("     starting address, we can use the variable name $rbp,")
+  out.line("     since GDB automatically has variables (they all start")
+  out.line("     with $) for all the registers.")
+  out.line("     Enter the command: memory")
+  out.line("     (Address: $rbp-0x186d0 and Format: s)" + colors.nc)
+  out.flush()
+  command = raw_input(prompt)
+  handle_quit(command)
+  while (command != "memory"):
+    out.line(wrong_command_1 + "memory" + wrong_command_2)
+    out.flush()
+    command = raw_input(prompt)
+    handle_quit(command)
+  out.flush()
+  gdb.execute(command)
+
+  # We found the secret!
+  out.line(colors.nc + colors.i)
+  out.line("Woohoo!! There it is!! Looks like we are getting an iPhone 6174")
+  out.line("after all... and a trip to Miami!")
+  out.line("")
+  out.line("Can you keep using these techniques to find the actual password?")
+  out.line("You might find these commands useful:")
+  out.line(" show loops main")
+  out.line(" instruction info cmp")
+  out.line("")
+  out.line("Good luck on your quest!")
+  out.line(colors.nc)
+  out.flush()